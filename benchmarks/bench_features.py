@@ -0,0 +1,94 @@
+"""
+Benchmark character n-gram feature extraction (`sentsplit.train._sample_to_features`).
+Compares the interned-piece encoder against the original per-character f-string implementation
+and checks that both produce identical features and tags.
+
+Usage: python benchmarks/bench_features.py [-l en] [-n 200] [--line-length 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import pycrfsuite
+
+from sentsplit import config
+from sentsplit.train import _sample_to_features
+
+SAMPLE = (
+    "Tell people you’re learning English. They will usually be understanding! "
+    "You might be surprised at how patient people are when they know you’re still learning. "
+    "Ask people to repeat things you don’t understand, e.g. numbers like 3.14 or 2021. "
+    "“Hi [name], nice to meet you.” Say this to someone you just met for the first time? "
+)
+
+
+def _legacy_sample_to_features(sample: list[tuple[str, str]], ngram: int) -> list[list[str]]:
+    def _char_to_features(i: int) -> list[str]:
+        char = sample[i][0]
+        feats = [
+            "bias",
+            f"char={char}",
+            f"char.isdigit={char.isdigit()}",
+            f"char.isupper={char.isupper()}",
+        ]
+        for j in range(1, min(i, ngram) + 1):
+            char_j = sample[i - j][0]
+            feats.append(f"-{j}:char={char_j}")
+        for j in range(1, min(len(sample) - 1 - i, ngram) + 1):
+            char_j = sample[i + j][0]
+            feats.append(f"+{j}:char={char_j}")
+        return feats
+
+    features = []
+    for i in range(len(sample)):
+        features.append(_char_to_features(i))
+    return features
+
+
+def make_lines(num_lines: int, line_length: int) -> list[str]:
+    text = SAMPLE * (line_length // len(SAMPLE) + 2)
+    return [text[i % len(SAMPLE) : i % len(SAMPLE) + line_length] for i in range(num_lines)]
+
+
+def time_chars_per_sec(func, lines: list[str], ngram: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line, ngram)
+        best = min(best, time.perf_counter() - start)
+    return sum(len(line) for line in lines) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-l", "--lang", default="en")
+    parser.add_argument("-n", "--num_lines", type=int, default=200)
+    parser.add_argument("--line_length", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lang_config = getattr(config, f"{args.lang}_config")
+    ngram = lang_config["ngram"]
+    lines = make_lines(args.num_lines, args.line_length)
+
+    tagger = pycrfsuite.Tagger()
+    tagger.open(str(Path(config.__file__).parent / lang_config["model"]))
+    for line in lines:
+        legacy = _legacy_sample_to_features(line, ngram)
+        current = _sample_to_features(line, ngram)
+        assert legacy == current, "features differ"
+        assert tagger.tag(legacy) == tagger.tag(current), "tags differ"
+    tagger.close()
+
+    before = time_chars_per_sec(_legacy_sample_to_features, lines, ngram, args.repeat)
+    after = time_chars_per_sec(_sample_to_features, lines, ngram, args.repeat)
+    print(f"before: {before:,.0f} chars/sec")
+    print(f"after:  {after:,.0f} chars/sec ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
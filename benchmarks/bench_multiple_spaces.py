@@ -0,0 +1,85 @@
+"""
+Benchmark the substitution and restoration of multiple spaces on whitespace-dense documents
+(e.g. OCR output or tables), comparing the offset mapping of `SentSplit` against the previous implementation,
+which re-sliced the whole tag list for every run of spaces.
+
+Usage: python benchmarks/bench_multiple_spaces.py [--sizes 1000 4000 16000 64000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import regex as re
+
+from sentsplit.segment import SentSplit
+
+
+def _legacy_substitute_multiple_spaces(line: str) -> tuple[str, list[tuple[int, int]]]:
+    positions = []
+
+    def repl(match: re.Match) -> str:
+        positions.append(match.span(0))
+        return " "
+
+    return re.sub(r"\s{2,}", repl, line), positions
+
+
+def _legacy_adjust_tags(y_tags: list[str], positions: list[tuple[int, int]]) -> list[str]:
+    for start_char_ind, end_char_ind in positions:
+        y_tags = (
+            y_tags[: start_char_ind + 1] + ["O"] * (end_char_ind - start_char_ind - 1) + y_tags[start_char_ind + 1 :]
+        )
+    return y_tags
+
+
+def make_table(num_chars: int, seed: int = 0) -> str:
+    """Table-like text where cells are padded with runs of spaces"""
+    rng = random.Random(seed)
+    cells = []
+    length = 0
+    while length < num_chars:
+        cell = rng.choice(["Total", "12.5", "N/A", "Revenue", "2021", "Q3.", "-"]) + " " * rng.randint(2, 12)
+        cells.append(cell)
+        length += len(cell)
+    return "".join(cells)[:num_chars]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 64000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        text = make_table(size)
+        preprocessed, positions = _legacy_substitute_multiple_spaces(text)
+        y_tags = ["EOS" if char == "." else "O" for char in preprocessed]
+
+        def legacy() -> list[str]:
+            return _legacy_adjust_tags(list(y_tags), _legacy_substitute_multiple_spaces(text)[1])
+
+        def current() -> bytearray:
+            return SentSplit._adjust_tags_for_multiple_spaces(
+                [bytearray(tag == "EOS" for tag in y_tags)], [SentSplit._substitute_multiple_spaces(text)[1]]
+            )[0]
+
+        assert bytearray(tag == "EOS" for tag in legacy()) == current(), "tags differ"
+        timings = []
+        for func in (legacy, current):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+        print(
+            f"{size:>8,} chars, {len(positions):>6,} runs: before {timings[0] * 1e3:9.2f} ms"
+            f"  after {timings[1] * 1e3:7.2f} ms ({timings[0] / timings[1]:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
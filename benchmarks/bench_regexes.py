@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of the regexes in `sentsplit.regexes`.
+Compares matching with raw pattern strings via `regex.finditer` (compiled-pattern cache lookup on every call)
+against the precompiled `RegexRegistry`, which also skips strings lacking the pattern's required literals,
+and checks that both find the same matches.
+
+Usage: python benchmarks/bench_regexes.py [-n 1000] [--line_length 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import regex as re
+
+from sentsplit import regexes
+from sentsplit.regexes import Regex, RegexRegistry
+
+PROSE = (
+    "Tell people you’re learning English. They will usually be understanding! "
+    "Ask people to repeat things you don’t understand, e.g. numbers like 3.14 or 2021; "
+    "“Hi [name], nice to meet you.” Say this to someone you just met… for the first time? "
+)
+WEB = "See https://example.com/docs?page=2 or www.example.org for details. Mail admin@example.net today. "
+
+
+def make_lines(sample: str, num_lines: int, line_length: int) -> list[str]:
+    text = sample * (line_length // len(sample) + 2)
+    return [text[i % len(sample) : i % len(sample) + line_length] for i in range(num_lines)]
+
+
+def time_interleaved(funcs: list, repeat: int) -> list[float]:
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.perf_counter()
+            func()
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--num_lines", type=int, default=1000)
+    parser.add_argument("--line_length", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rgxs = [value for value in vars(regexes).values() if isinstance(value, dict) and "regex" in value]
+    for corpus_name, sample in (("prose", PROSE), ("web", WEB)):
+        lines = make_lines(sample, args.num_lines, args.line_length)
+        num_chars = sum(len(line) for line in lines)
+        print(f"{corpus_name} ({num_chars:,} chars)")
+        for rgx in rgxs:
+            registry = RegexRegistry([Regex(**rgx)])
+
+            def raw() -> list:
+                return [[m.span() for m in re.finditer(rgx["regex"], line)] for line in lines]
+
+            def registered() -> list:
+                return [[m.span() for _, m in registry.finditer(line)] for line in lines]
+
+            assert raw() == registered(), f"{rgx['name']}: matches differ"
+            before, after = time_interleaved([raw, registered], args.repeat)
+            print(
+                f"  {rgx['name']:<30} before: {num_chars / before / 1e6:6.2f} M chars/sec"
+                f"  after: {num_chars / after / 1e6:6.2f} M chars/sec ({before / after:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
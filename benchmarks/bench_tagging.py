@@ -0,0 +1,77 @@
+"""
+Benchmark CRF tagging of character n-gram features.
+Compares feeding `tagger.tag` with the full list-of-lists `str` features against `SentSplit._tag`,
+which builds UTF-8 keys resolved against the model's attributes, and checks that tags are identical.
+
+Usage: python benchmarks/bench_tagging.py [-l en] [-n 200] [--line_length 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sentsplit.segment import SentSplit
+from sentsplit.train import _sample_to_features
+
+SAMPLES = {
+    "en": "Tell people you’re learning English. They will usually be understanding! "
+    "Ask people to repeat things you don’t understand, e.g. numbers like 3.14 or 2021. "
+    "“Hi [name], nice to meet you.” Say this to someone you just met for the first time? ",
+    "ja": "これはテストの文です。ここにもう一つあります！東京都は日本の首都であり、人口は約1400万人です。"
+    "「こんにちは」と彼は言った。明日の天気はどうでしょうか？",
+    "ko": "이것은 테스트 문장입니다. 여기에 하나 더 있습니다! 서울은 대한민국의 수도이며 인구는 약 950만 명입니다. "
+    "“안녕하세요”라고 그가 말했다. 내일 날씨는 어떨까요? ",
+    "zh": "这是一个测试句子。这里还有另一个！北京是中国的首都，人口约为2100万。“你好”，他说。明天的天气怎么样？",
+}
+
+
+def make_lines(lang: str, num_lines: int, line_length: int) -> list[str]:
+    sample = SAMPLES.get(lang, SAMPLES["en"])
+    text = sample * (line_length // len(sample) + 2)
+    return [text[i % len(sample) : i % len(sample) + line_length] for i in range(num_lines)]
+
+
+def time_chars_per_sec(funcs: list, lines: list[str], repeat: int) -> list[float]:
+    """Time `funcs` in interleaved rounds, so that noise on a busy machine affects all of them alike"""
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.perf_counter()
+            for line in lines:
+                func(line)
+            best[index] = min(best[index], time.perf_counter() - start)
+    num_chars = sum(len(line) for line in lines)
+    return [num_chars / elapsed for elapsed in best]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-l", "--lang", default="en")
+    parser.add_argument("-n", "--num_lines", type=int, default=200)
+    parser.add_argument("--line_length", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    splitter = SentSplit(args.lang)
+    ngram = splitter.config["ngram"]
+    lines = make_lines(args.lang, args.num_lines, args.line_length)
+
+    def list_of_lists(line: str) -> list[str]:
+        return splitter.tagger.tag(_sample_to_features(line, ngram))
+
+    num_features = num_kept = 0
+    for line in lines:
+        assert list_of_lists(line) == splitter._tag(line), "tags differ"
+        num_features += sum(len(feats) for feats in _sample_to_features(line, ngram))
+        num_kept += sum(sum(1 for feat in feats if feat) for feats in splitter._encoder.encode(line))
+
+    before, after = time_chars_per_sec([list_of_lists, splitter._tag], lines, args.repeat)
+    print(f"features unknown to the model: {1 - num_kept / num_features:.1%}")
+    print(f"before: {before:,.0f} chars/sec")
+    print(f"after:  {after:,.0f} chars/sec ({after / before:.2f}x)")
+    splitter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,53 @@
-import argparse
-import json
+import importlib
 
-import sentsplit.cli
 import sentsplit.meta_data
-import sentsplit.segment
-import sentsplit.train
+
+# submodules are imported on first attribute access, so `import sentsplit` does not load
+# the CRF, regex and logging dependencies until they are needed
+_SUBMODULES = {
+    "aio",
+    "bench",
+    "cache",
+    "cli",
+    "config",
+    "crfmodel",
+    "engine",
+    "instrument",
+    "multi",
+    "parallel",
+    "prune",
+    "regexes",
+    "result_cache",
+    "segment",
+    "server",
+    "train",
+    "utils",
+}
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"sentsplit.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def str_to_bool(v):
     return str(v).lower() in ("yes", "true", "t", "1")
 
 
+def _cli_command(name: str):
+    """Return a subcommand handler that imports `sentsplit.cli` only when the subcommand runs"""
+
+    def command(args) -> None:
+        return getattr(sentsplit.cli, name)(args)
+
+    return command
+
+
 def main(*args: str) -> None:
+    import argparse
+    import json
+
     parser = argparse.ArgumentParser(description=sentsplit.meta_data.description)
     parser.add_argument(
         "-v",
@@ -84,7 +120,7 @@ def main(*args: str) -> None:
         help="ratio of training samples without whitespaces inbetween the sentences; "
         "1.0 means 100%% of the samples are despaced",
     )
-    subparser_train.set_defaults(func=sentsplit.cli.sentsplit_train)
+    subparser_train.set_defaults(func=_cli_command("sentsplit_train"))
 
     # segment a given text file
     subparser_segment = subparsers.add_parser(
@@ -147,7 +183,136 @@ def main(*args: str) -> None:
         default=1,
         help="number of CPU cores to use; default is 1 (single core)",
     )
-    subparser_segment.set_defaults(func=sentsplit.cli.sentsplit_segment)
+    subparser_segment.add_argument(
+        "--result_cache",
+        help="path to a SQLite file caching the sentences of each line, shared by the cores and kept across runs",
+    )
+    subparser_segment.add_argument(
+        "--engine",
+        choices=["crfsuite", "numpy"],
+        default="crfsuite",
+        help='tagging engine; "numpy" gives the same sentences much faster, but requires NumPy',
+    )
+    subparser_segment.add_argument(
+        "--sparse_context",
+        type=int,
+        help="tag only this many characters (at least ngram) around punctuation, and the others as not ending "
+        "a sentence; faster on long prose, check the agreement with `sentsplit bench --sparse_context` first",
+    )
+    subparser_segment.add_argument(
+        "--long_line_chars",
+        type=int,
+        help="with several cores, tag lines longer than this in overlapping windows on all the cores; the windows "
+        "are checked to agree where they overlap, so the results match in practice but are not guaranteed to be "
+        "identical; e.g. 1000000 for text extracted from PDFs without line breaks",
+    )
+    subparser_segment.set_defaults(func=_cli_command("sentsplit_segment"))
+
+    # benchmark each stage of the segmentation pipeline
+    subparser_bench = subparsers.add_parser(
+        "bench",
+        help="benchmark each stage of segmentation on a synthetic or given corpus and report the results in JSON",
+    )
+    subparser_bench.add_argument(
+        "-l",
+        "--lang",
+        nargs="+",
+        required=True,
+        help='ISO language code(s), e.g. "ko", "en", or "all" for every built-in language',
+    )
+    subparser_bench.add_argument(
+        "-c",
+        "--corpus",
+        help="path to a corpus file with one document per line; a synthetic corpus is generated if not given",
+    )
+    subparser_bench.add_argument("--num_docs", type=int, default=200, help="number of synthetic documents")
+    subparser_bench.add_argument(
+        "--doc_length", type=int, default=1000, help="length of each synthetic document in characters"
+    )
+    subparser_bench.add_argument("--repeat", type=int, default=5, help="number of timed runs; the best is reported")
+    subparser_bench.add_argument("--seed", type=int, default=0, help="random seed of the synthetic corpus")
+    subparser_bench.add_argument(
+        "--sparse_context",
+        type=int,
+        help="also compare sparse tagging with this context (see `segment --sparse_context`) with full tagging",
+    )
+    subparser_bench.add_argument("-o", "--output", help="path to output JSON file, default is stdout")
+    subparser_bench.set_defaults(func=_cli_command("sentsplit_bench"))
+
+    # export a CRF model to the memory-mapped format of the numpy engine
+    subparser_export = subparsers.add_parser(
+        "export-model",
+        help="convert a CRF model into the compact, memory-mapped emission tables used by `--engine numpy`",
+    )
+    subparser_export.add_argument("-l", "--lang", required=True, help='ISO language code, e.g. "ko", "en"')
+    subparser_export.add_argument(
+        "-m", "--model", help="path to the CRF model, default is the built-in model of `lang`"
+    )
+    subparser_export.add_argument("--ngram", type=int, help="maximum ngram of the features, default is that of `lang`")
+    subparser_export.add_argument(
+        "-o",
+        "--output",
+        help="path to the exported model, default is `{model name}.emissions` in the current directory",
+    )
+    subparser_export.set_defaults(func=_cli_command("sentsplit_export_model"))
+
+    # prune a CRF model and compare it with the original
+    subparser_prune = subparsers.add_parser(
+        "prune",
+        help="write a smaller CRF model without its weakest features, optionally with quantized weights, and "
+        "report the size, tagging throughput and boundary F1 of both models on a held-out corpus",
+    )
+    subparser_prune.add_argument("-l", "--lang", required=True, help='ISO language code, e.g. "ko", "en"')
+    subparser_prune.add_argument(
+        "-c", "--corpus", required=True, help="path to held-out sentences, one per line like a training corpus"
+    )
+    subparser_prune.add_argument("-m", "--model", help="path to the CRF model, default is the built-in model of `lang`")
+    subparser_prune.add_argument("--ngram", type=int, help="maximum ngram of the features, default is that of `lang`")
+    subparser_prune.add_argument(
+        "--threshold", type=float, default=0.0, help="drop the features whose absolute weight is below this"
+    )
+    subparser_prune.add_argument("--top_k", type=int, help="keep only the k features of largest absolute weight")
+    subparser_prune.add_argument(
+        "--quantize_bits",
+        type=int,
+        help="round the weights to this many bits, e.g. 8; features rounded to 0 are dropped",
+    )
+    subparser_prune.add_argument(
+        "--doc_sentences", type=int, default=10, help="number of held-out sentences joined into one document"
+    )
+    subparser_prune.add_argument("--repeat", type=int, default=3, help="number of timed runs; the best is reported")
+    subparser_prune.add_argument(
+        "-o",
+        "--output",
+        help="path to the pruned model, default is `{model name}.pruned.model` in the current directory",
+    )
+    subparser_prune.add_argument("--report", help="path to output JSON report, default is stdout")
+    subparser_prune.set_defaults(func=_cli_command("sentsplit_prune"))
+
+    # serve segmentation requests with resident models
+    subparser_serve = subparsers.add_parser(
+        "serve",
+        help="answer JSON segmentation requests, one per line on stdin, or over HTTP with `--port`, "
+        "keeping the models loaded between requests",
+    )
+    subparser_serve.add_argument(
+        "-l", "--lang", help='ISO language code of requests without a "lang", e.g. "ko", "en"; loaded at startup'
+    )
+    subparser_serve.add_argument("--port", type=int, help="serve over HTTP on this port instead of stdin/stdout")
+    subparser_serve.add_argument("--host", default="127.0.0.1", help="host to bind with `--port`")
+    subparser_serve.add_argument(
+        "--max_batch_size", type=int, default=256, help="maximum number of queued requests segmented together"
+    )
+    subparser_serve.add_argument(
+        "--max_model_bytes", type=int, help="cap on the total size of the model files of loaded languages"
+    )
+    subparser_serve.add_argument(
+        "--engine",
+        choices=["crfsuite", "numpy"],
+        default="crfsuite",
+        help='tagging engine; "numpy" gives the same sentences much faster, but requires NumPy',
+    )
+    subparser_serve.set_defaults(func=_cli_command("sentsplit_serve"))
 
     args = parser.parse_args()
     args.func(args)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from sentsplit import parallel
+from sentsplit.segment import SentSplit
+
+
+def _segment_requests(sentsplit: SentSplit, strings: list[str], strip_flags: list[bool]) -> list[list[str]]:
+    """Segment a micro-batch of requests, in one `segment_batch` call per value of `strip_spaces`"""
+    results: list[list[str]] = [[] for _ in strings]
+    for strip_spaces in set(strip_flags):
+        indices = [index for index, flag in enumerate(strip_flags) if flag == strip_spaces]
+        for index, sentences in zip(indices, sentsplit.segment_batch([strings[i] for i in indices], strip_spaces)):
+            results[index] = sentences
+    return results
+
+
+def _segment_requests_in_worker(strings: list[str], strip_flags: list[bool]) -> list[list[str]]:
+    return _segment_requests(parallel._worker_sentsplit, strings, strip_flags)
+
+
+class _Request:
+    __slots__ = ("string", "strip_spaces", "future")
+
+    def __init__(self, string: str, strip_spaces: bool, future: asyncio.Future) -> None:
+        self.string = string
+        self.strip_spaces = strip_spaces
+        self.future = future
+
+
+class AsyncSentSplit:
+    """
+    Segment strings from asyncio code without blocking the event loop.
+    Segmentation runs on a pool of `workers` threads (`executor="thread"`) or processes (`executor="process"`),
+    each with its own `SentSplit`, since a tagger must not be used by several threads at once.
+
+    Requests waiting for a free worker are coalesced into micro-batches of at most `max_batch_size` requests
+    and about `max_batch_chars` characters, segmented in one `SentSplit.segment_batch` call; `batch_delay`
+    (in seconds) optionally holds each batch back to let more requests join it. At most `max_in_flight`
+    requests are queued or running, and further calls to `segment` wait for one of them to finish.
+
+    An instance is bound to the event loop in which it is first used. Close it with `aclose()`
+    or use it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        lang: str,
+        workers: int = 1,
+        executor: str = "thread",
+        max_in_flight: int = 1024,
+        max_batch_size: int = 64,
+        max_batch_chars: int = 1 << 16,
+        batch_delay: float = 0.0,
+        **kwargs: Any,
+    ) -> None:
+        assert workers > 0 and max_in_flight > 0 and max_batch_size > 0 and max_batch_chars > 0
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', not {executor!r}")
+        self.lang = lang
+        self.workers = workers
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.max_batch_size = max_batch_size
+        self.max_batch_chars = max_batch_chars
+        self.batch_delay = batch_delay
+        self.kwargs = kwargs
+
+        # loaded in this process so that configuration errors surface here rather than in the workers
+        self.sentsplit = SentSplit(lang, **kwargs)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread_sentsplits: list[SentSplit] = []
+        self._executor: Executor
+        if executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentsplit")
+        else:
+            # load the model before the workers are forked, so that they share its pages
+            self.sentsplit.warmup()
+            parallel._parent_sentsplits[id(self)] = self.sentsplit
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=parallel._init_worker, initargs=(id(self), lang, kwargs)
+            )
+
+        # asyncio state, created in the event loop on first use
+        self._pending: deque[_Request] = deque()
+        self._has_pending: asyncio.Event | None = None
+        self._in_flight: asyncio.Semaphore | None = None
+        self._worker_slots: asyncio.Semaphore | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._closed = False
+        self.num_requests = 0
+        self.num_batches = 0
+        self.num_batched_requests = 0
+
+    async def __aenter__(self) -> AsyncSentSplit:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    def _start(self) -> None:
+        self._has_pending = asyncio.Event()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        # a batch is only formed when a worker is free, so requests arriving meanwhile are batched together
+        self._worker_slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def segment(self, string: str, strip_spaces: bool | None = None, timeout: float | None = None) -> list[str]:
+        """
+        Segment `string` on a worker and return its sentences.
+        :param timeout: seconds to wait for the sentences, including the time spent waiting for a slot,
+            after which `asyncio.TimeoutError` is raised; a timed out or cancelled request is dropped
+            from its batch if it has not been sent to a worker yet, and its result is discarded otherwise
+        """
+        if self._closed:
+            raise RuntimeError("AsyncSentSplit is closed")
+        if self._dispatcher is None:
+            self._start()
+        return await asyncio.wait_for(self._submit(string, self.sentsplit._resolve_strip_spaces(strip_spaces)), timeout)
+
+    async def _submit(self, string: str, strip_spaces: bool) -> list[str]:
+        async with self._in_flight:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append(_Request(string, strip_spaces, future))
+            self._has_pending.set()
+            self.num_requests += 1
+            return await future
+
+    def _take_batch(self) -> list[_Request]:
+        """Pop the requests of the next batch, skipping those cancelled while they were waiting"""
+        batch = []
+        num_chars = 0
+        while self._pending and len(batch) < self.max_batch_size:
+            request = self._pending[0]
+            if request.future.done():
+                self._pending.popleft()
+                continue
+            if batch and num_chars + len(request.string) > self.max_batch_chars:
+                break
+            batch.append(self._pending.popleft())
+            num_chars += len(request.string)
+        return batch
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        func = self._segment_in_thread if self.executor == "thread" else _segment_requests_in_worker
+        while True:
+            await self._worker_slots.acquire()
+            while not self._pending:
+                self._has_pending.clear()
+                await self._has_pending.wait()
+            if self.batch_delay > 0:
+                await asyncio.sleep(self.batch_delay)
+            batch = self._take_batch()
+            if not batch:
+                self._worker_slots.release()
+                continue
+            self.num_batches += 1
+            self.num_batched_requests += len(batch)
+            strings = [request.string for request in batch]
+            strip_flags = [request.strip_spaces for request in batch]
+            try:
+                result = loop.run_in_executor(self._executor, func, strings, strip_flags)
+            except RuntimeError as e:  # the executor was shut down
+                self._worker_slots.release()
+                self._complete(batch, None, e)
+                continue
+            result.add_done_callback(functools.partial(self._on_batch_done, batch))
+
+    def _on_batch_done(self, batch: list[_Request], result: asyncio.Future) -> None:
+        self._worker_slots.release()
+        if result.cancelled():
+            self._complete(batch, None, asyncio.CancelledError())
+        elif result.exception() is not None:
+            self._complete(batch, None, result.exception())
+        else:
+            self._complete(batch, result.result(), None)
+
+    @staticmethod
+    def _complete(batch: list[_Request], sentences_batch: list[list[str]] | None, error: BaseException | None) -> None:
+        for index, request in enumerate(batch):
+            if request.future.done():  # cancelled or timed out while running
+                continue
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(sentences_batch[index])
+
+    def _segment_in_thread(self, strings: list[str], strip_flags: list[bool]) -> list[list[str]]:
+        sentsplit = getattr(self._local, "sentsplit", None)
+        if sentsplit is None:
+            sentsplit = self._local.sentsplit = SentSplit(self.lang, **self.kwargs)
+            with self._lock:
+                self._thread_sentsplits.append(sentsplit)
+        return _segment_requests(sentsplit, strings, strip_flags)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the number of requests and batches so far, and of requests waiting for a worker"""
+        return {
+            "requests": self.num_requests,
+            "batches": self.num_batches,
+            "mean_batch_size": self.num_batched_requests / self.num_batches if self.num_batches else 0.0,
+            "pending": sum(1 for request in self._pending if not request.future.done()),
+        }
+
+    async def aclose(self) -> None:
+        """Cancel the requests that have not been sent to a worker, wait for the others and release the workers"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+        while self._pending:
+            self._pending.popleft().future.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        parallel._parent_sentsplits.pop(id(self), None)
+        for sentsplit in self._thread_sentsplits:
+            sentsplit.close()
+        self._thread_sentsplits.clear()
+        self.sentsplit.close()
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Sequence
+
+from sentsplit import config, meta_data
+from sentsplit.segment import _TAG_CODES, SentSplit
+from sentsplit.utils import split_keep_multiple_separators
+
+# a few sentences per built-in language, sampled to generate synthetic corpora
+SAMPLE_SENTENCES = {
+    "de": [
+        "Das ist ein Test.",
+        "Dr. Müller kam um 9.30 Uhr an!",
+        "Wie geht es Ihnen heute?",
+        "Weitere Infos unter www.example.de/info und z.B. im Handbuch.",
+        "„Guten Morgen“, sagte sie.",
+    ],
+    "en": [
+        "Tell people you’re learning English.",
+        "Dr. Smith arrived at 3.30 p.m. on Monday!",
+        "Ask people to repeat things you don’t understand?",
+        "See www.example.com/docs for details, e.g. the FAQ.",
+        "“Hi, nice to meet you,” she said.",
+    ],
+    "fr": [
+        "Ceci est un test.",
+        "M. Dupont est arrivé à 9 h 30 !",
+        "Comment allez-vous aujourd’hui ?",
+        "Voir www.exemple.fr/aide pour plus de détails, p. ex. la FAQ.",
+        "« Bonjour », dit-elle.",
+    ],
+    "it": [
+        "Questo è un test.",
+        "Il dott. Rossi è arrivato alle 9.30!",
+        "Come stai oggi?",
+        "Vedi www.esempio.it/aiuto per i dettagli, ad es. le FAQ.",
+        "«Buongiorno», disse lei.",
+    ],
+    "ja": [
+        "これはテストの文です。",
+        "東京都は日本の首都であり、人口は約1400万人です！",
+        "明日の天気はどうでしょうか？",
+        "詳しくはwww.example.jpをご覧ください。",
+        "「こんにちは」と彼は言った。",
+    ],
+    "ko": [
+        "이것은 테스트 문장입니다.",
+        "서울은 대한민국의 수도이며 인구는 약 950만 명입니다!",
+        "내일 날씨는 어떨까요?",
+        "자세한 내용은 www.example.kr/help 를 참고하세요.",
+        "“안녕하세요”라고 그가 말했다.",
+    ],
+    "lt": [
+        "Tai yra bandymas.",
+        "Dr. Petraitis atvyko 9.30 val.!",
+        "Kaip jums šiandien sekasi?",
+        "Daugiau informacijos www.pavyzdys.lt/pagalba svetainėje.",
+        "„Labas rytas“, – pasakė ji.",
+    ],
+    "pl": [
+        "To jest test.",
+        "Dr Kowalski przyjechał o godz. 9.30!",
+        "Jak się dzisiaj masz?",
+        "Więcej informacji na www.przyklad.pl/pomoc, np. w FAQ.",
+        "„Dzień dobry” – powiedziała.",
+    ],
+    "pt": [
+        "Isto é um teste.",
+        "O Sr. Silva chegou às 9h30!",
+        "Como você está hoje?",
+        "Veja www.exemplo.com.br/ajuda para mais detalhes, p. ex. o FAQ.",
+        "“Bom dia”, disse ela.",
+    ],
+    "ru": [
+        "Это тестовое предложение.",
+        "Д-р Иванов приехал в 9.30 утра!",
+        "Как у вас дела сегодня?",
+        "Подробнее см. www.example.ru/help, т.е. раздел FAQ.",
+        "«Доброе утро», — сказала она.",
+    ],
+    "tr": [
+        "Bu bir test cümlesidir.",
+        "Dr. Yılmaz saat 9.30'da geldi!",
+        "Bugün nasılsınız?",
+        "Ayrıntılar için www.ornek.com.tr/yardim adresine bakın.",
+        "“Günaydın” dedi.",
+    ],
+    "zh": [
+        "这是一个测试句子。",
+        "北京是中国的首都，人口约为2100万！",
+        "明天的天气怎么样？",
+        "详情请访问www.example.cn/help。",
+        "“你好，”他说。",
+    ],
+}
+
+
+def builtin_languages() -> list[str]:
+    return sorted(
+        name[: -len("_config")] for name in vars(config) if name.endswith("_config") and name != "base_config"
+    )
+
+
+def make_corpus(lang: str, num_docs: int, doc_length: int, seed: int = 0) -> list[str]:
+    """
+    Generate `num_docs` synthetic documents of about `doc_length` characters from the sample sentences of `lang`,
+    with occasional line feeds and runs of spaces so that every stage of the pipeline is exercised
+    """
+    sentences = SAMPLE_SENTENCES.get(lang, SAMPLE_SENTENCES["en"])
+    rng = random.Random(seed)
+    separator = "" if lang in {"ja", "zh"} else " "
+    docs = []
+    for _ in range(num_docs):
+        doc = rng.choice(sentences)
+        while len(doc) < doc_length:
+            doc += rng.choices([separator, "\n", "   "], weights=[8, 1, 1])[0] + rng.choice(sentences)
+        docs.append(doc)
+    return docs
+
+
+def _time_best(func: Callable[[Any], Any], make_inputs: Callable[[], Sequence[Any]], repeat: int) -> float:
+    """Return the best time of `repeat` runs of `func` over fresh inputs, excluding the time to make the inputs"""
+    best = float("inf")
+    for _ in range(repeat):
+        inputs = make_inputs()
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def run_benchmark(
+    lang: str,
+    docs: list[str] | None = None,
+    num_docs: int = 200,
+    doc_length: int = 1000,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Time each stage of `SentSplit._segment` separately over a corpus (`docs`, or a synthetic one),
+    as well as end-to-end segmentation, and return the measurements as a JSON-serializable dict
+    """
+    if docs is None:
+        docs = make_corpus(lang, num_docs, doc_length, seed)
+    # memoization would hide the cost of the stages on repeated fragments
+    splitter = SentSplit(lang, fragment_memo_chars=0).warmup()
+    cfg = splitter.config
+    strip_spaces = cfg["strip_spaces"]
+    encoder = splitter._get_encoder()
+    tagger = splitter.tagger
+    num_chars = sum(len(doc) for doc in docs)
+
+    # run the pipeline once to prepare the inputs of every stage
+    fragments = [fragment for doc in docs for fragment in split_keep_multiple_separators(doc, ["\n"])]
+    if cfg["handle_multiple_spaces"]:
+        substituted = [SentSplit._substitute_multiple_spaces(fragment) for fragment in fragments]
+    else:
+        substituted = [(fragment, None) for fragment in fragments]
+    features = [encoder.encode(string) for string, _ in substituted]
+    crf_tags = [tagger.tag(xseq) for xseq in features]
+
+    def to_bytearrays() -> list[bytearray]:
+        return [bytearray(map(_TAG_CODES.__getitem__, tags)) for tags in crf_tags]
+
+    def adjusted_tags() -> list[bytearray]:
+        if not cfg["handle_multiple_spaces"]:
+            return to_bytearrays()
+        return SentSplit._adjust_tags_for_multiple_spaces(to_bytearrays(), [offsets for _, offsets in substituted])
+
+    def segment_regex_tags() -> list[bytearray]:
+        return SentSplit._tag_segment_regexes(adjusted_tags(), fragments, splitter._segment_regexes)
+
+    def prevent_regex_tags() -> list[bytearray]:
+        return SentSplit._tag_prevent_regexes(
+            segment_regex_tags(), fragments, splitter._prevent_regexes, cfg["maxcut"], cfg["prevent_word_split"]
+        )
+
+    final_tags = prevent_regex_tags()
+
+    stages = {
+        "split_keep_multiple_separators": (lambda doc: split_keep_multiple_separators(doc, ["\n"]), lambda: docs),
+        "substitute_multiple_spaces": (
+            SentSplit._substitute_multiple_spaces,
+            lambda: fragments if cfg["handle_multiple_spaces"] else [],
+        ),
+        "features": (encoder.encode, lambda: [string for string, _ in substituted]),
+        "tagger.tag": (tagger.tag, lambda: features),
+        "adjust_tags_for_multiple_spaces": (
+            lambda args: SentSplit._adjust_tags_for_multiple_spaces(*args),
+            lambda: (
+                [(to_bytearrays(), [offsets for _, offsets in substituted])] if cfg["handle_multiple_spaces"] else []
+            ),
+        ),
+        "tag_segment_regexes": (
+            lambda y_tags: SentSplit._tag_segment_regexes(y_tags, fragments, splitter._segment_regexes),
+            lambda: [adjusted_tags()],
+        ),
+        "tag_prevent_regexes": (
+            lambda y_tags: SentSplit._tag_prevent_regexes(
+                y_tags, fragments, splitter._prevent_regexes, cfg["maxcut"], cfg["prevent_word_split"]
+            ),
+            lambda: [segment_regex_tags()],
+        ),
+        "segment_by_char_tag": (
+            lambda args: SentSplit._segment_by_char_tag(
+                [args[0]], [args[1]], strip_spaces, cfg["maxcut"], cfg["mincut"]
+            ),
+            lambda: list(zip(fragments, final_tags)),
+        ),
+    }
+    stage_results = {}
+    for name, (func, make_inputs) in stages.items():
+        seconds = _time_best(func, make_inputs, repeat)
+        stage_results[name] = {"seconds": seconds, "chars_per_sec": num_chars / seconds if seconds else None}
+
+    sentences = [sentence for doc in docs for sentence in splitter.segment(doc)]
+    staged_sentences = [
+        sentence for args in zip(fragments, final_tags) for sentence in stages["segment_by_char_tag"][0](args)
+    ]
+    assert staged_sentences == sentences, "the timed stages do not reproduce `SentSplit.segment`"
+    num_sentences = len(sentences)
+    seconds = _time_best(splitter.segment, lambda: docs, repeat)
+    stages_seconds = sum(result["seconds"] for result in stage_results.values())
+    for result in stage_results.values():
+        result["share"] = result["seconds"] / stages_seconds if stages_seconds else None
+
+    tracemalloc.start()
+    for doc in docs:
+        splitter.segment(doc)
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    splitter.close()
+
+    return {
+        "lang": lang,
+        "num_docs": len(docs),
+        "num_chars": num_chars,
+        "num_fragments": len(fragments),
+        "num_sentences": num_sentences,
+        "stages": stage_results,
+        "segment": {
+            "seconds": seconds,
+            "chars_per_sec": num_chars / seconds,
+            "sentences_per_sec": num_sentences / seconds,
+        },
+        "memory": {"peak_traced_bytes": peak_traced, "peak_rss_bytes": _peak_rss_bytes()},
+    }
+
+
+def sparse_agreement(
+    lang: str,
+    docs: list[str] | None = None,
+    sparse_context: int | None = None,
+    num_docs: int = 200,
+    doc_length: int = 1000,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Compare the sentence boundaries found with `SentSplit(lang, sparse_context=...)` (`ngram` by default)
+    with those of full tagging over a corpus (`docs`, or a synthetic one), along with the share of characters
+    tagged by the CRF model and the time of end-to-end segmentation, as a JSON-serializable dict
+    """
+    if docs is None:
+        docs = make_corpus(lang, num_docs, doc_length, seed)
+    # memoization would hide the cost of tagging on repeated fragments
+    full = SentSplit(lang, fragment_memo_chars=0).warmup()
+    cfg = full.config
+    if sparse_context is None:
+        sparse_context = cfg["ngram"]
+    sparse = SentSplit(lang, fragment_memo_chars=0, sparse_context=sparse_context).warmup()
+
+    fragments = [fragment for doc in docs for fragment in split_keep_multiple_separators(doc, ["\n"])]
+    if cfg["handle_multiple_spaces"]:
+        fragments = [SentSplit._substitute_multiple_spaces(fragment)[0] for fragment in fragments]
+    margin = cfg["ngram"]
+    num_tagged_chars = sum(
+        min(len(fragment), end + margin) - max(0, start - margin)
+        for fragment in fragments
+        for start, end in SentSplit._candidate_windows(fragment, sparse_context, margin)
+    )
+
+    full_spans = full.segment_spans_batch(docs)
+    sparse_spans = sparse.segment_spans_batch(docs)
+    num_full = num_sparse = num_agreeing = 0
+    for doc_full_spans, doc_sparse_spans in zip(full_spans, sparse_spans):
+        full_ends = {end for _, end in doc_full_spans}
+        sparse_ends = {end for _, end in doc_sparse_spans}
+        num_full += len(full_ends)
+        num_sparse += len(sparse_ends)
+        num_agreeing += len(full_ends & sparse_ends)
+
+    full_seconds = _time_best(full.segment_batch, lambda: [docs], repeat)
+    sparse_seconds = _time_best(sparse.segment_batch, lambda: [docs], repeat)
+    full.close()
+    sparse.close()
+
+    num_chars = sum(len(doc) for doc in docs)
+    return {
+        "lang": lang,
+        "sparse_context": sparse_context,
+        "num_docs": len(docs),
+        "num_chars": num_chars,
+        "tagged_chars": num_tagged_chars,
+        "tagged_share": num_tagged_chars / num_chars if num_chars else None,
+        "full_boundaries": num_full,
+        "sparse_boundaries": num_sparse,
+        "agreeing_boundaries": num_agreeing,
+        "precision": num_agreeing / num_sparse if num_sparse else 1.0,
+        "recall": num_agreeing / num_full if num_full else 1.0,
+        "identical_docs": sum(a == b for a, b in zip(full_spans, sparse_spans)) / len(docs) if docs else 1.0,
+        "full_seconds": full_seconds,
+        "sparse_seconds": sparse_seconds,
+        "speedup": full_seconds / sparse_seconds if sparse_seconds else None,
+    }
+
+
+def environment() -> dict[str, str]:
+    return {
+        "sentsplit": meta_data.version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
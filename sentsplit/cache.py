@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import pycrfsuite
+
+from sentsplit.segment import SentSplit
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert (nested) config values into a hashable key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, os.PathLike):
+        return os.fspath(value)
+    return value
+
+
+class _CachedSentSplit(SentSplit):
+    """`SentSplit` whose tagger is opened and owned by a `SentSplitCache`"""
+
+    def __init__(self, cache: SentSplitCache, lang: str, **kwargs: Any) -> None:
+        self._cache = cache
+        super().__init__(lang, **kwargs)
+
+    def _load_model(self, model_path: str) -> pycrfsuite.Tagger:
+        return self._cache._open_tagger(model_path)
+
+    def close(self) -> None:
+        """No-op: the instance is shared through the cache, whose `close()` closes the tagger"""
+
+    def _release_tagger(self) -> None:
+        """Forget the tagger closed by the cache, so that the model is opened again on next use"""
+        self._tagger = None
+        self._emission_tagger = None
+        self._encoder = None
+
+
+class SentSplitCache:
+    """
+    Thread-safe LRU cache of `SentSplit` instances, keyed by language, model file (path and modification time)
+    and effective config, so that building a splitter for a known configuration costs a dictionary lookup.
+    Instances of the same model file share one opened tagger; a model file that changed on disk is reloaded.
+
+    Returned instances are shared: their `close()` is a no-op, and taggers are closed by `close()` of the cache.
+    Evicted instances are only dropped from the cache, so callers still holding them can keep using them,
+    and instances still held when the cache is closed open their model again on next use.
+    Like any `SentSplit`, an instance should be used by one thread at a time.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # (lang, effective config, model mtime, constructor options) -> instance
+        self._instances: OrderedDict[Hashable, _CachedSentSplit] = OrderedDict()
+        # (lang, overrides) -> (model path, model mtime, key of `_instances`), to skip resolving the config on hits
+        self._resolved_keys: dict[Hashable, tuple[str, int, Hashable]] = {}
+        # (model path, model mtime) -> tagger shared by the cached instances of that model
+        self._taggers: dict[tuple[str, int], pycrfsuite.Tagger] = {}
+        # every instance created, including those evicted but still held by callers
+        self._created: weakref.WeakSet[_CachedSentSplit] = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def get(self, lang: str, **kwargs: Any) -> SentSplit:
+        """Return the cached `SentSplit(lang, **kwargs)`, creating it on a miss"""
+        overrides_key = (lang, _freeze(kwargs))
+        with self._lock:
+            resolved = self._resolved_keys.get(overrides_key)
+            if resolved is not None:
+                model_path, mtime, key = resolved
+                instance = self._instances.get(key)
+                if instance is not None and os.stat(model_path).st_mtime_ns == mtime:
+                    self._instances.move_to_end(key)
+                    return instance
+
+            overrides = dict(kwargs)
+            # constructor options of `SentSplit` that are not part of its config
+            options = {
+                name: overrides.pop(name)
+                for name in (
+                    "result_cache",
+                    "fragment_memo_chars",
+                    "instrumentation",
+                    "engine",
+                    "sparse_context",
+                    "window_tagger",
+                )
+                if name in overrides
+            }
+            config = SentSplit._resolve_config(lang, overrides)
+            model_path = config["model"]
+            mtime = os.stat(model_path).st_mtime_ns
+            key = (lang, _freeze(config), mtime, _freeze(options))
+            self._resolved_keys[overrides_key] = (model_path, mtime, key)
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = _CachedSentSplit(self, lang, **kwargs)
+                self._instances[key] = instance
+                self._created.add(instance)
+                if len(self._instances) > self.maxsize:
+                    self._evict(next(iter(self._instances)))
+            self._instances.move_to_end(key)
+            return instance
+
+    def _open_tagger(self, model_path: str) -> pycrfsuite.Tagger:
+        """Return the shared tagger of a model file, called by a cached instance on its first use"""
+        model_key = (model_path, os.stat(model_path).st_mtime_ns)
+        with self._lock:
+            tagger = self._taggers.get(model_key)
+            if tagger is None:
+                tagger = self._taggers[model_key] = SentSplit._load_model(model_path)
+            return tagger
+
+    def _evict(self, key: Hashable) -> None:
+        instance = self._instances.pop(key)
+        self._resolved_keys = {k: v for k, v in self._resolved_keys.items() if v[2] != key}
+        # the tagger is released (and closed once no caller holds the instance) when no cached instance uses it
+        tagger = instance._tagger
+        if tagger is not None and all(other._tagger is not tagger for other in self._instances.values()):
+            self._taggers = {k: v for k, v in self._taggers.items() if v is not tagger}
+
+    def clear(self) -> None:
+        """Drop all cached instances without closing their taggers"""
+        with self._lock:
+            self._instances.clear()
+            self._resolved_keys.clear()
+            self._taggers.clear()
+
+    def close(self) -> None:
+        """Close the taggers of all cached instances and empty the cache; instances still held reopen their model"""
+        with self._lock:
+            taggers = list(self._taggers.values())
+            for instance in self._created:
+                instance._release_tagger()
+            self._instances.clear()
+            self._resolved_keys.clear()
+            self._taggers.clear()
+        for tagger in taggers:
+            tagger.close()
+
+
+_default_cache = SentSplitCache()
+
+
+def get_sentsplit(lang: str, **kwargs: Any) -> SentSplit:
+    """Return a `SentSplit(lang, **kwargs)` shared through the process-wide `SentSplitCache`"""
+    return _default_cache.get(lang, **kwargs)
+
+
+def clear_cache() -> None:
+    """Close and drop all instances of the process-wide `SentSplitCache`"""
+    _default_cache.close()
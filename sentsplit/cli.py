@@ -1,21 +1,21 @@
 from __future__ import annotations
 
+import json
 import os
 import pprint
-import subprocess
 import sys
 from argparse import Namespace
 from copy import deepcopy
 from datetime import datetime
-from multiprocessing import Pool
 
 from loguru import logger
-from tqdm import tqdm
 
 from sentsplit import config
+from sentsplit.parallel import ParallelSegmenter
+from sentsplit.result_cache import ResultCache
 from sentsplit.segment import SentSplit
 from sentsplit.train import train_crf_model
-from sentsplit.utils import write_lines
+from sentsplit.utils import read_lines
 
 
 def sentsplit_train(args: Namespace) -> None:
@@ -51,10 +51,6 @@ def sentsplit_train(args: Namespace) -> None:
     )
 
 
-def call_sentsplit_batch(line: str) -> list[str]:
-    return sentsplit.segment(line.rstrip("\n"))
-
-
 def sentsplit_segment(args: Namespace) -> None:
     lang = args.lang
     input_file = args.input
@@ -64,8 +60,11 @@ def sentsplit_segment(args: Namespace) -> None:
         output_file = f"{input_file}.segment"
 
     override_options = vars(args)
-    cores = override_options["cores"]
-    del override_options["cores"]
+    cores = override_options.pop("cores")
+    result_cache_path = override_options.pop("result_cache")
+    engine = override_options.pop("engine")
+    sparse_context = override_options.pop("sparse_context")
+    long_line_chars = override_options.pop("long_line_chars")
     try:
         default_config = deepcopy(getattr(config, f"{lang}_config"))
     except AttributeError:
@@ -76,25 +75,122 @@ def sentsplit_segment(args: Namespace) -> None:
         if override_options[k] is not None:
             default_config[k] = override_options[k]
 
-    global sentsplit
-    sentsplit = SentSplit(lang, **default_config)
-
-    num_lines = int(subprocess.check_output(["wc", "-l", input_file]).decode("utf8").split()[0])
-    with open(input_file) as inf, open(output_file, "w") as outf:
-        cnt = 0
-        if cores <= 1:
-            for line in tqdm(inf, total=num_lines):
-                line = line.rstrip("\n")
-                segments = sentsplit.segment(line)
-                for segment in segments:
-                    outf.write(f"{segment}\n")
-                cnt += len(segments)
-        else:
-            with Pool(processes=cores) as p:
-                pooled_results = list(tqdm(p.imap(call_sentsplit_batch, inf, chunksize=700), total=num_lines))
-            sentences = [item for sublist in pooled_results for item in sublist]
-            cnt = len(sentences)
-            write_lines(sentences, output_file)
-
-        logger.info(f"{num_lines} lines are segmented into {cnt} sentences, and saved at {output_file}")
-    sentsplit.close()
+    result_cache = None if result_cache_path is None else ResultCache(path=result_cache_path)
+    with ParallelSegmenter(
+        lang,
+        processes=cores,
+        result_cache=result_cache,
+        engine=engine,
+        sparse_context=sparse_context,
+        long_line_chars=long_line_chars,
+        **default_config,
+    ) as segmenter:
+        num_lines, cnt = segmenter.segment_file(input_file, output_file, progress=True)
+    if result_cache is not None:
+        result_cache.close()
+    logger.info(f"{num_lines} lines are segmented into {cnt} sentences, and saved at {output_file}")
+
+
+def sentsplit_bench(args: Namespace) -> None:
+    from sentsplit import bench
+
+    langs = bench.builtin_languages() if args.lang == ["all"] else args.lang
+    docs = read_lines(args.corpus) if args.corpus is not None else None
+    results = []
+    for lang in langs:
+        logger.info(f"Benchmarking {lang.upper()}..")
+        result = bench.run_benchmark(lang, docs, args.num_docs, args.doc_length, args.repeat, args.seed)
+        if args.sparse_context is not None:
+            result["sparse_tagging"] = bench.sparse_agreement(
+                lang, docs, args.sparse_context, args.num_docs, args.doc_length, args.repeat, args.seed
+            )
+        results.append(result)
+    report = json.dumps({"environment": bench.environment(), "results": results}, indent=2)
+
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, "w") as outf:
+            outf.write(f"{report}\n")
+        logger.info(f"Benchmark results saved at {args.output}")
+
+
+def sentsplit_serve(args: Namespace) -> None:
+    from sentsplit.server import SegmentationServer, make_http_server, serve_ndjson
+
+    server = SegmentationServer(
+        args.lang, max_batch_size=args.max_batch_size, max_model_bytes=args.max_model_bytes, engine=args.engine
+    )
+    if args.lang is not None:
+        server.multi.get(args.lang)
+    if args.port is None:
+        logger.info("Serving newline-delimited JSON requests from stdin..")
+        serve_ndjson(server, sys.stdin, sys.stdout)
+    else:
+        http_server = make_http_server(server, args.host, args.port)
+        logger.info(f"Serving on http://{args.host}:{http_server.server_port}..")
+        try:
+            http_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            http_server.server_close()
+            server.close()
+    logger.info(f"Served requests: {json.dumps(server.stats())}")
+
+
+def sentsplit_export_model(args: Namespace) -> None:
+    from sentsplit.crfmodel import read_crfsuite_model
+    from sentsplit.engine import EmissionTagger
+
+    overrides = {} if args.ngram is None else {"ngram": args.ngram}
+    if args.model is not None:
+        overrides["model"] = os.path.abspath(args.model)
+    lang_config = SentSplit._resolve_config(args.lang, overrides)
+    model_path = lang_config["model"]
+    output_path = args.output
+    if output_path is None:
+        output_path = f"{os.path.splitext(os.path.basename(model_path))[0]}.emissions"
+
+    tagger = EmissionTagger.from_crf_model(read_crfsuite_model(model_path), lang_config["ngram"])
+    tagger.save(output_path)
+    logger.info(
+        f"{model_path} ({os.path.getsize(model_path)} bytes) is exported to {output_path} "
+        f"({os.path.getsize(output_path)} bytes); load it with `SentSplit(lang, model=path, engine='numpy')`"
+    )
+
+
+def sentsplit_prune(args: Namespace) -> None:
+    from sentsplit.prune import prune_and_report
+
+    overrides = {} if args.ngram is None else {"ngram": args.ngram}
+    if args.model is not None:
+        overrides["model"] = os.path.abspath(args.model)
+    output_path = args.output
+    if output_path is None:
+        model_path = SentSplit._resolve_config(args.lang, overrides)["model"]
+        output_path = f"{os.path.splitext(os.path.basename(model_path))[0]}.pruned.model"
+
+    result = prune_and_report(
+        args.lang,
+        output_path,
+        read_lines(args.corpus),
+        args.threshold,
+        args.top_k,
+        args.quantize_bits,
+        args.doc_sentences,
+        args.repeat,
+        **overrides,
+    )
+    report = json.dumps(result, indent=2)
+    if args.report is None:
+        print(report)
+    else:
+        with open(args.report, "w") as outf:
+            outf.write(f"{report}\n")
+        logger.info(f"Pruning report saved at {args.report}")
+    before, after = result["before"], result["after"]
+    logger.info(
+        f"Pruned model saved at {output_path}: {before['model_bytes']} -> {after['model_bytes']} bytes, "
+        f"F1 {before['f1']:.4f} -> {after['f1']:.4f}"
+    )
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple
+
+# layout of a CRFsuite model file (1st-order CRF, "FOMC"), all integers little-endian
+_HEADER = struct.Struct("<4sI4sIIIIIIIII")
+_CHUNK_HEADER = struct.Struct("<4sII")
+_FEATURE = struct.Struct("<IIId")
+_CQDB_HEADER = struct.Struct("<4sIIIII")
+_UINT32 = struct.Struct("<I")
+_CQDB_BUCKET = struct.Struct("<II")
+_CQDB_NUM_TABLES = 256
+_CQDB_BYTEORDER_CHECK = 0x62445371
+_CQDB_DATA_OFFSET = _CQDB_HEADER.size + _CQDB_NUM_TABLES * _CQDB_BUCKET.size
+_MODEL_VERSION = 100
+
+# first bytes of a model exported by `sentsplit export-model`, see `sentsplit.engine.EmissionTagger.save`
+EXPORTED_MODEL_MAGIC = b"SSEMTBL\x00"
+
+# feature types
+_STATE_FEATURE = 0
+_TRANSITION_FEATURE = 1
+
+
+class CRFModel(NamedTuple):
+    """Weights of a CRFsuite model, read from its file without rounding (unlike `Tagger.info()`)"""
+
+    labels: list[str]
+    attributes: list[str]
+    # (attribute id, label id, weight)
+    state_features: list[tuple[int, int, float]]
+    # transitions[i][j] is the weight of the transition from label i to label j
+    transitions: list[list[float]]
+
+
+def _read_cqdb(data: bytes, offset: int) -> list[str]:
+    """Read the strings of a constant quark database (CQDB) chunk, indexed by their ids"""
+    magic, _, _, _, num_records, backward_offset = _CQDB_HEADER.unpack_from(data, offset)
+    if magic != b"CQDB":
+        raise ValueError("Invalid CRFsuite model: missing string database")
+    strings = []
+    for index in range(num_records):
+        (record_offset,) = _UINT32.unpack_from(data, offset + backward_offset + 4 * index)
+        record_id, key_size = struct.unpack_from("<II", data, offset + record_offset)
+        assert record_id == index
+        key_start = offset + record_offset + 8
+        # the key size counts the terminating null byte
+        strings.append(data[key_start : key_start + key_size - 1].decode("utf-8"))
+    return strings
+
+
+def read_crfsuite_model(model_path: str) -> CRFModel:
+    """Read the labels, attributes and weights of a CRFsuite model file"""
+    with open(model_path, "rb") as inf:
+        data = inf.read()
+    magic, _, model_type, _, _, num_labels, num_attributes, features_offset, labels_offset, attributes_offset, *_ = (
+        _HEADER.unpack_from(data, 0)
+    )
+    if magic != b"lCRF" or model_type != b"FOMC":
+        raise ValueError(f"Not a CRFsuite model of a 1st-order CRF: {model_path}")
+
+    chunk_magic, _, num_features = _CHUNK_HEADER.unpack_from(data, features_offset)
+    if chunk_magic != b"FEAT":
+        raise ValueError(f"Invalid CRFsuite model: missing features in {model_path}")
+    labels = _read_cqdb(data, labels_offset)
+    attributes = _read_cqdb(data, attributes_offset)
+    assert len(labels) == num_labels and len(attributes) == num_attributes
+
+    state_features = []
+    transitions = [[0.0] * num_labels for _ in range(num_labels)]
+    for feature_type, source, destination, weight in _FEATURE.iter_unpack(
+        data[features_offset + _CHUNK_HEADER.size : features_offset + _CHUNK_HEADER.size + num_features * _FEATURE.size]
+    ):
+        if feature_type == _STATE_FEATURE:
+            state_features.append((source, destination, weight))
+        elif feature_type == _TRANSITION_FEATURE:
+            transitions[source][destination] = weight
+    return CRFModel(labels, attributes, state_features, transitions)
+
+
+def _rotate(value: int, bits: int) -> int:
+    return ((value << bits) | (value >> (32 - bits))) & 0xFFFFFFFF
+
+
+# rotations of the `mix()` and `final()` steps of lookup3.c
+_MIX_ROTATIONS = (4, 6, 8, 16, 19, 4)
+_FINAL_ROTATIONS = (14, 11, 25, 16, 4, 14, 24)
+
+
+def _hashlittle(key: bytes, initval: int = 0) -> int:
+    """`hashlittle()` of Bob Jenkins' lookup3.c, with which CQDB finds its keys"""
+    mask = 0xFFFFFFFF
+    abc = [(0xDEADBEEF + len(key) + initval) & mask] * 3
+    position = 0
+    while len(key) - position > 12:
+        for i in range(3):
+            abc[i] = (abc[i] + int.from_bytes(key[position + 4 * i : position + 4 * i + 4], "little")) & mask
+        # a -= c; a ^= rot(c, 4); c += b; then the same for (b, a, c), (c, b, a), ...
+        for step, bits in enumerate(_MIX_ROTATIONS):
+            x, y, z = step % 3, (step + 1) % 3, (step + 2) % 3
+            abc[x] = ((abc[x] - abc[z]) & mask) ^ _rotate(abc[z], bits)
+            abc[z] = (abc[z] + abc[y]) & mask
+        position += 12
+    if position == len(key):
+        return abc[2]
+    tail = key[position:].ljust(12, b"\0")
+    for i in range(3):
+        abc[i] = (abc[i] + int.from_bytes(tail[4 * i : 4 * i + 4], "little")) & mask
+    # c ^= b; c -= rot(b, 14); then the same for (a, c), (b, a), (c, b), ...
+    for step, bits in enumerate(_FINAL_ROTATIONS):
+        x = (2 + step) % 3
+        source = (x + 2) % 3
+        abc[x] = ((abc[x] ^ abc[source]) - _rotate(abc[source], bits)) & mask
+    return abc[2]
+
+
+def _write_cqdb(strings: list[str]) -> bytes:
+    """Build a CQDB chunk of `strings`, with ids by position; its offsets are relative to the chunk"""
+    records = bytearray()
+    tables: list[list[tuple[int, int]]] = [[] for _ in range(_CQDB_NUM_TABLES)]
+    backward = []
+    for string_id, string in enumerate(strings):
+        key = string.encode("utf-8") + b"\0"
+        record_offset = _CQDB_DATA_OFFSET + len(records)
+        records += struct.pack("<II", string_id, len(key)) + key
+        hash_value = _hashlittle(key)
+        tables[hash_value % _CQDB_NUM_TABLES].append((hash_value, record_offset))
+        backward.append(record_offset)
+
+    # open-addressing hash tables, twice as large as their number of keys
+    table_refs = bytearray()
+    buckets = bytearray()
+    for table in tables:
+        if not table:
+            table_refs += _CQDB_BUCKET.pack(0, 0)
+            continue
+        num_buckets = 2 * len(table)
+        slots = [(0, 0)] * num_buckets
+        for hash_value, record_offset in table:
+            slot = (hash_value >> 8) % num_buckets
+            while slots[slot][1] != 0:
+                slot = (slot + 1) % num_buckets
+            slots[slot] = (hash_value, record_offset)
+        table_refs += _CQDB_BUCKET.pack(_CQDB_DATA_OFFSET + len(records) + len(buckets), num_buckets)
+        buckets += b"".join(_CQDB_BUCKET.pack(*slot) for slot in slots)
+
+    backward_offset = _CQDB_DATA_OFFSET + len(records) + len(buckets)
+    size = backward_offset + 4 * len(backward)
+    header = _CQDB_HEADER.pack(b"CQDB", size, 0, _CQDB_BYTEORDER_CHECK, len(backward), backward_offset)
+    return header + bytes(table_refs) + bytes(records) + bytes(buckets) + struct.pack(f"<{len(backward)}I", *backward)
+
+
+def _write_feature_refs(magic: bytes, refs: list[list[int] | None], offset: int) -> bytes:
+    """
+    Build a chunk listing the feature ids of each label or attribute, to be written at `offset`.
+    A `None` entry gets no list at all (offset 0), which CRFsuite only expects for its BOS and EOS labels:
+    the list of any other entry is read, even if it is empty.
+    """
+    offsets = []
+    lists = bytearray()
+    data_offset = offset + _CHUNK_HEADER.size + 4 * len(refs)
+    for feature_ids in refs:
+        if feature_ids is None:
+            offsets.append(0)
+            continue
+        offsets.append(data_offset + len(lists))
+        lists += struct.pack(f"<{1 + len(feature_ids)}I", len(feature_ids), *feature_ids)
+    size = _CHUNK_HEADER.size + 4 * len(refs) + len(lists)
+    return _CHUNK_HEADER.pack(magic, size, len(refs)) + struct.pack(f"<{len(refs)}I", *offsets) + bytes(lists)
+
+
+def write_crfsuite_model(model: CRFModel, model_path: str) -> None:
+    """
+    Write a model in the file format of CRFsuite, so that `pycrfsuite.Tagger` can open it.
+    State features are written in their order, followed by the non-zero transitions.
+    """
+    num_labels = len(model.labels)
+    features = [
+        (_STATE_FEATURE, attribute_id, label_id, weight) for attribute_id, label_id, weight in model.state_features
+    ]
+    features += [
+        (_TRANSITION_FEATURE, source, destination, weight)
+        for source, row in enumerate(model.transitions)
+        for destination, weight in enumerate(row)
+        if weight != 0.0
+    ]
+    # features of each attribute, and transitions from each label; CRFsuite has two more labels (BOS and EOS)
+    attribute_refs: list[list[int]] = [[] for _ in model.attributes]
+    label_refs: list[list[int] | None] = [[] for _ in range(num_labels)] + [None, None]
+    for feature_id, (feature_type, source, _, _) in enumerate(features):
+        (attribute_refs if feature_type == _STATE_FEATURE else label_refs)[source].append(feature_id)
+
+    features_offset = _HEADER.size
+    data = bytearray(_HEADER.size)
+    data += _CHUNK_HEADER.pack(b"FEAT", _CHUNK_HEADER.size + len(features) * _FEATURE.size, len(features))
+    data += b"".join(_FEATURE.pack(*feature) for feature in features)
+    labels_offset = len(data)
+    data += _write_cqdb(model.labels)
+    attributes_offset = len(data)
+    data += _write_cqdb(model.attributes)
+    data += bytes(-len(data) % 4)
+    label_refs_offset = len(data)
+    data += _write_feature_refs(b"LFRF", label_refs, label_refs_offset)
+    data += bytes(-len(data) % 4)
+    attribute_refs_offset = len(data)
+    data += _write_feature_refs(b"AFRF", attribute_refs, attribute_refs_offset)
+    data[: _HEADER.size] = _HEADER.pack(
+        b"lCRF",
+        len(data),
+        b"FOMC",
+        _MODEL_VERSION,
+        0,
+        num_labels,
+        len(model.attributes),
+        features_offset,
+        labels_offset,
+        attributes_offset,
+        label_refs_offset,
+        attribute_refs_offset,
+    )
+    with open(model_path, "wb") as outf:
+        outf.write(data)
+
+
+def is_exported_model(model_path: str) -> bool:
+    """Return whether `model_path` is a model exported by `sentsplit export-model` rather than a CRFsuite model"""
+    with open(model_path, "rb") as inf:
+        return inf.read(len(EXPORTED_MODEL_MAGIC)) == EXPORTED_MODEL_MAGIC
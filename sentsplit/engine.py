@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+
+import regex as re
+
+try:
+    import numpy as np
+except ImportError as e:  # optional dependency, only needed for `SentSplit(..., engine="numpy")`
+    raise ImportError("The numpy tagging engine requires NumPy: pip install numpy") from e
+
+from sentsplit.crfmodel import EXPORTED_MODEL_MAGIC, CRFModel, is_exported_model, read_crfsuite_model
+from sentsplit.segment import _TAG_CODES
+
+# attributes of `_CharFeatureEncoder` that depend on one character: `char=`, `-j:char=` and `+j:char=`
+_CHAR_ATTRIBUTE = re.compile(r"(?:([-+])(\d+):)?char=(.)", re.DOTALL)
+
+# ids of the rows of the emission tables: 0 is the padding around strings, which contributes nothing,
+# followed by the characters unknown to the model, by (isdigit, isupper), and then the known characters
+_PADDING_ID = 0
+_NUM_UNKNOWN_CLASSES = 4
+_FIRST_CHAR_ID = 1 + _NUM_UNKNOWN_CLASSES
+
+# format of the models exported by `EmissionTagger.save`
+_EXPORT_VERSION = 1
+_ALIGNMENT = 64
+
+# strings of similar lengths are tagged in lockstep when there are at least this many of them,
+# below which the per-step overhead of numpy exceeds that of a plain loop
+_MIN_LOCKSTEP_WIDTH = 32
+
+
+def _unknown_class_id(char: str) -> int:
+    return 1 + 2 * char.isdigit() + char.isupper()
+
+
+class EmissionTagger:
+    """
+    Tag strings with a CRFsuite model trained on `_CharFeatureEncoder` features, with the same tags as
+    `pycrfsuite.Tagger.tag` but without building any feature.
+
+    Every feature is either `bias` or a property of one character at a fixed offset from the tagged one, so the
+    emission (state) scores of a character are the sum of the row of its own features and of the rows of its
+    neighbours as the `-j`-th/`+j`-th character. These tables are built once from the model weights; the
+    emissions of a whole batch are gathered from them at once, and the tags are decoded with a two-label Viterbi
+    run in lockstep over strings of similar lengths. Scores are summed in the same order as CRFsuite and ties are
+    broken the same way, so the tags are identical.
+    """
+
+    def __init__(
+        self,
+        labels: list[str],
+        transitions: list[list[float]],
+        codes: np.ndarray,
+        own: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+    ) -> None:
+        """
+        :param labels: labels of the model, by label id
+        :param transitions: transitions[i][j] is the weight of the transition from label i to label j
+        :param codes: sorted code points of the characters known to the model, whose rows start at `_FIRST_CHAR_ID`
+        :param own: `(num_ids, num_labels)` scores of the own features of each character
+        :param left: `(ngram, num_ids, num_labels)` scores of each character as the `-(j + 1)`-th neighbour
+        :param right: `(ngram, num_ids, num_labels)` scores of each character as the `+(j + 1)`-th neighbour
+        """
+        if sorted(labels) != sorted(_TAG_CODES):
+            raise ValueError(f"The model must have the labels {sorted(_TAG_CODES)}, not {labels}")
+        self.labels = list(labels)
+        self.transitions = [list(weights) for weights in transitions]
+        self.ngram = len(left)
+        # tags are decoded as label ids of the model, which may be ordered differently from `_TAG_CODES`
+        self._label_codes = bytes(_TAG_CODES[label] for label in labels).ljust(256, b"\0")
+        (self._t00, self._t01), (self._t10, self._t11) = transitions
+        self._codes = codes
+        self._own = own
+        self._left = left
+        self._right = right
+
+    @classmethod
+    def from_crf_model(cls, model: CRFModel, ngram: int) -> EmissionTagger:
+        """Build the emission tables of a CRFsuite model for the features of `_CharFeatureEncoder(ngram)`"""
+        num_labels = len(model.labels)
+        weights: dict[str, list[tuple[int, float]]] = {}
+        chars = set()
+        for attribute_id, label_id, weight in model.state_features:
+            attribute = model.attributes[attribute_id]
+            weights.setdefault(attribute, []).append((label_id, weight))
+            match = _CHAR_ATTRIBUTE.fullmatch(attribute)
+            if match is not None and (match.group(2) is None or int(match.group(2)) <= ngram):
+                chars.add(match.group(3))
+
+        def row(attributes: list[str]) -> list[float]:
+            # summed attribute by attribute like CRFsuite, so that the scores are the same to the last bit
+            scores = [0.0] * num_labels
+            for attribute in attributes:
+                for label_id, weight in weights.get(attribute, ()):
+                    scores[label_id] += weight
+            return scores
+
+        chars = sorted(chars)
+        num_ids = _FIRST_CHAR_ID + len(chars)
+        codes = np.array([ord(char) for char in chars], dtype=np.uint32)
+        own = np.zeros((num_ids, num_labels))
+        left = np.zeros((ngram, num_ids, num_labels))
+        right = np.zeros((ngram, num_ids, num_labels))
+        for isdigit in (False, True):
+            for isupper in (False, True):
+                own[1 + 2 * isdigit + isupper] = row(["bias", f"char.isdigit={isdigit}", f"char.isupper={isupper}"])
+        for char_id, char in enumerate(chars, _FIRST_CHAR_ID):
+            own[char_id] = row(
+                ["bias", f"char={char}", f"char.isdigit={char.isdigit()}", f"char.isupper={char.isupper()}"]
+            )
+            for j in range(ngram):
+                left[j, char_id] = row([f"-{j + 1}:char={char}"])
+                right[j, char_id] = row([f"+{j + 1}:char={char}"])
+        return cls(model.labels, model.transitions, codes, own, left, right)
+
+    @classmethod
+    def from_model_file(cls, model_path: str, ngram: int) -> EmissionTagger:
+        """Load an exported model (see `save`), or build the tables of a CRFsuite model"""
+        if not is_exported_model(model_path):
+            return cls.from_crf_model(read_crfsuite_model(model_path), ngram)
+        tagger = cls.load(model_path)
+        if tagger.ngram != ngram:
+            raise ValueError(f"{model_path} was exported for ngram={tagger.ngram}, not {ngram}")
+        return tagger
+
+    def save(self, output_path: str) -> None:
+        """
+        Export the tables to a file that `load` maps into memory: a magic number, the size of a JSON header,
+        the header with the labels, transitions and the layout of the arrays, and the arrays themselves,
+        each aligned to `_ALIGNMENT` bytes
+        """
+        arrays = {"codes": self._codes, "own": self._own, "left": self._left, "right": self._right}
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = {"offset": offset, "dtype": array.dtype.newbyteorder("<").str, "shape": list(array.shape)}
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        header = json.dumps(
+            {"version": _EXPORT_VERSION, "labels": self.labels, "transitions": self.transitions, "arrays": layout}
+        ).encode("utf-8")
+        # the arrays start at an aligned offset after the header
+        data_offset = -(-(len(EXPORTED_MODEL_MAGIC) + 4 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+        header = header.ljust(data_offset - len(EXPORTED_MODEL_MAGIC) - 4)
+        with open(output_path, "wb") as outf:
+            outf.write(EXPORTED_MODEL_MAGIC)
+            outf.write(struct.pack("<I", len(header)))
+            outf.write(header)
+            for name, array in arrays.items():
+                outf.seek(data_offset + layout[name]["offset"])
+                outf.write(array.astype(layout[name]["dtype"], copy=False).tobytes())
+
+    @classmethod
+    def load(cls, model_path: str) -> EmissionTagger:
+        """
+        Load a model exported by `save`. Its arrays are read-only views of the memory-mapped file, so loading
+        does not read the tables, and processes that load the same file share their pages.
+        """
+        with open(model_path, "rb") as inf:
+            mapped = mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[: len(EXPORTED_MODEL_MAGIC)] != EXPORTED_MODEL_MAGIC:
+            raise ValueError(f"Not an exported model: {model_path}")
+        (header_size,) = struct.unpack_from("<I", mapped, len(EXPORTED_MODEL_MAGIC))
+        header_offset = len(EXPORTED_MODEL_MAGIC) + 4
+        header = json.loads(mapped[header_offset : header_offset + header_size])
+        if header["version"] != _EXPORT_VERSION:
+            raise ValueError(f"Unsupported version {header['version']} of exported model: {model_path}")
+        data_offset = header_offset + header_size
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            arrays[name] = np.frombuffer(
+                mapped, dtype=spec["dtype"], count=int(np.prod(shape)), offset=data_offset + spec["offset"]
+            ).reshape(shape)
+        return cls(header["labels"], header["transitions"], **arrays)
+
+    def _char_ids(self, codes: np.ndarray) -> np.ndarray:
+        """Map code points to the rows of the emission tables"""
+        positions = np.searchsorted(self._codes, codes)
+        np.minimum(positions, len(self._codes) - 1, out=positions)
+        known = self._codes[positions] == codes if len(self._codes) else np.zeros(len(codes), dtype=bool)
+        ids = positions + _FIRST_CHAR_ID
+        if not known.all():
+            unknown_codes = codes[~known]
+            unique_codes = np.unique(unknown_codes)
+            class_ids = np.array([_unknown_class_id(chr(code)) for code in unique_codes.tolist()], dtype=ids.dtype)
+            ids[~known] = class_ids[np.searchsorted(unique_codes, unknown_codes)]
+        return ids
+
+    def emissions(self, strings: list[str]) -> tuple[np.ndarray, list[int]]:
+        """
+        Return the emission scores of all characters of `strings`, concatenated in a `(num_chars, num_labels)`
+        array, and the offset of each string into it
+        """
+        ngram = self.ngram
+        lengths = [len(string) for string in strings]
+        offsets = np.cumsum([0] + lengths).tolist()
+        codes = np.frombuffer("".join(strings).encode("utf-32-le", "surrogatepass"), dtype="<u4")
+        # strings are laid out one after another with `ngram` padding ids in between,
+        # so that a character never sees the characters of another string as neighbours
+        positions = np.arange(len(codes)) + ngram * (1 + np.repeat(np.arange(len(strings)), lengths))
+        ids = np.full(len(codes) + ngram * (len(strings) + 1), _PADDING_ID, dtype=np.intp)
+        ids[positions] = self._char_ids(codes)
+
+        # same order as the features of `_CharFeatureEncoder`: own, then left and right neighbours by distance;
+        # `take` gathers rows an order of magnitude faster than fancy indexing
+        scores = self._own.take(ids, axis=0)
+        for j in range(1, ngram + 1):
+            scores[j:] += self._left[j - 1].take(ids[:-j], axis=0)
+        for j in range(1, ngram + 1):
+            scores[:-j] += self._right[j - 1].take(ids[j:], axis=0)
+        return scores.take(positions, axis=0), offsets
+
+    def tag_batch(self, strings: list[str]) -> list[bytearray]:
+        """Tag each of `strings` and return their tags as `_O`/`_EOS` codes"""
+        return self.decode(*self.emissions(strings))
+
+    def decode(self, scores: np.ndarray, offsets: list[int]) -> list[bytearray]:
+        """Tag the strings whose emission scores and offsets are returned by `emissions`"""
+        num_strings = len(offsets) - 1
+        tags: list[bytearray | None] = [None] * num_strings
+        # sorted by decreasing length, and grouped so that no string is less than half as long as the longest
+        order = sorted(range(num_strings), key=lambda index: offsets[index] - offsets[index + 1])
+        start = 0
+        while start < len(order):
+            max_length = offsets[order[start] + 1] - offsets[order[start]]
+            end = start + 1
+            while end < len(order) and 2 * (offsets[order[end] + 1] - offsets[order[end]]) >= max_length:
+                end += 1
+            group = order[start:end]
+            if len(group) >= _MIN_LOCKSTEP_WIDTH and max_length > 0:
+                for index, labels in zip(group, self._viterbi_lockstep(scores, offsets, group)):
+                    tags[index] = labels
+            else:
+                for index in group:
+                    tags[index] = self._viterbi(scores[offsets[index] : offsets[index + 1]])
+            start = end
+        return [bytearray(labels.translate(self._label_codes)) for labels in tags]
+
+    def _viterbi(self, scores: np.ndarray) -> bytes:
+        """Decode the label ids of one string, with the same operations and tie-breaking as CRFsuite"""
+        length = len(scores)
+        if length == 0:
+            return b""
+        t00, t01, t10, t11 = self._t00, self._t01, self._t10, self._t11
+        states0 = scores[:, 0].tolist()
+        states1 = scores[:, 1].tolist()
+        # bit `j` of `back[t]` is the label at `t - 1` on the best path to label `j` at `t`
+        back = bytearray(length)
+        p0 = states0[0]
+        p1 = states1[0]
+        for t in range(1, length):
+            a = p0 + t00
+            b = p1 + t10
+            if a < b:
+                c0 = b
+                pointers = 1
+            else:
+                c0 = a
+                pointers = 0
+            a = p0 + t01
+            b = p1 + t11
+            if a < b:
+                c1 = b
+                pointers |= 2
+            else:
+                c1 = a
+            back[t] = pointers
+            p0 = c0 + states0[t]
+            p1 = c1 + states1[t]
+
+        labels = bytearray(length)
+        label = 1 if p0 < p1 else 0
+        labels[-1] = label
+        for t in range(length - 1, 0, -1):
+            label = (back[t] >> label) & 1
+            labels[t - 1] = label
+        return bytes(labels)
+
+    def _viterbi_lockstep(self, scores: np.ndarray, offsets: list[int], group: list[int]) -> list[bytes]:
+        """`_viterbi` of several strings at once, given by decreasing length, one time step at a time"""
+        lengths = np.array([offsets[index + 1] - offsets[index] for index in group])
+        max_length = int(lengths[0])
+        starts = np.array([offsets[index] for index in group])
+        # (string, time) -> row of `scores`; positions past the end of a string are never read
+        rows = np.minimum(starts[:, None] + np.arange(max_length), len(scores) - 1)
+        states0 = scores[rows, 0].T.copy()
+        states1 = scores[rows, 1].T.copy()
+        # number of strings at least `t + 1` long, i.e. still being decoded at time `t`
+        num_active = np.searchsorted(-lengths, -np.arange(max_length), side="left").tolist()
+
+        t00, t01, t10, t11 = self._t00, self._t01, self._t10, self._t11
+        back0 = np.zeros((max_length, len(group)), dtype=bool)
+        back1 = np.zeros((max_length, len(group)), dtype=bool)
+        p0 = states0[0].copy()
+        p1 = states1[0].copy()
+        for t in range(1, max_length):
+            k = num_active[t]
+            q0 = p0[:k]
+            q1 = p1[:k]
+            a = q0 + t00
+            b = q1 + t10
+            np.less(a, b, out=back0[t, :k])
+            c0 = np.maximum(a, b)
+            a = q0 + t01
+            b = q1 + t11
+            np.less(a, b, out=back1[t, :k])
+            c1 = np.maximum(a, b)
+            # strings that already ended keep the scores of their last character
+            np.add(c0, states0[t, :k], out=p0[:k])
+            np.add(c1, states1[t, :k], out=p1[:k])
+
+        labels = np.zeros((max_length, len(group)), dtype=np.uint8)
+        label = (p0 < p1).astype(np.uint8)
+        for t in range(max_length - 1, -1, -1):
+            k = num_active[t]
+            labels[t, :k] = label[:k]
+            if t > 0:
+                label[:k] = np.where(label[:k], back1[t, :k], back0[t, :k])
+        labels = labels.T
+        return [labels[i, :length].tobytes() for i, length in enumerate(lengths.tolist())]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Iterable
+
+# stages of `SentSplit._segment`, in pipeline order
+STAGES = (
+    "split",
+    "substitute_multiple_spaces",
+    "features",
+    "tag",
+    "adjust_multiple_spaces",
+    "segment_regexes",
+    "prevent_regexes",
+    "segment_by_char_tag",
+)
+
+COUNTERS = ("calls", "seconds", "chars", "tags", "regex_matches", "maxcut_fallbacks", "sentences")
+
+_COUNTER_HELP = {
+    "calls": "Number of times each stage of segmentation ran",
+    "seconds": "Cumulative time spent in each stage of segmentation",
+    "chars": "Characters processed by each stage of segmentation",
+    "tags": "Tags produced by the CRF model",
+    "regex_matches": "Matches of the segment and prevent regexes",
+    "maxcut_fallbacks": "Sentences cut heuristically because they reached maxcut",
+    "sentences": "Sentences produced",
+}
+
+Hook = Callable[[str, "dict[str, Any]"], None]
+
+
+class Instrumentation:
+    """
+    Opt-in per-stage instrumentation of `SentSplit`, enabled by passing it as `SentSplit(..., instrumentation=...)`.
+    Each stage of segmentation reports its elapsed time and counts (see `COUNTERS`), which are accumulated per stage
+    and passed to every hook as `hook(stage, counts)`. An instance may be shared by several `SentSplit`s.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = ()) -> None:
+        self.hooks = list(hooks)
+        self._lock = threading.Lock()
+        self._counters = {stage: dict.fromkeys(COUNTERS, 0) for stage in STAGES}
+
+    def add_hook(self, hook: Hook) -> None:
+        self.hooks.append(hook)
+
+    def record(self, stage: str, seconds: float, **counts: int) -> None:
+        """Add one run of `stage` that took `seconds` and produced `counts` (keys of `COUNTERS`)"""
+        counts["seconds"] = seconds
+        with self._lock:
+            counters = self._counters[stage]
+            counters["calls"] += 1
+            for name, value in counts.items():
+                counters[name] += value
+        for hook in self.hooks:
+            hook(stage, counts)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Return a copy of the cumulative counters, keyed by stage and then by counter"""
+        with self._lock:
+            return {stage: dict(counters) for stage, counters in self._counters.items()}
+
+    def to_prometheus(self, prefix: str = "sentsplit", labels: dict[str, str] | None = None) -> str:
+        """Export the cumulative counters in the Prometheus text exposition format"""
+        counters = self.as_dict()
+        extra_labels = "".join(f',{name}="{_escape_label(value)}"' for name, value in (labels or {}).items())
+        lines = []
+        for counter in COUNTERS:
+            metric = f"{prefix}_stage_{counter}_total"
+            lines.append(f"# HELP {metric} {_COUNTER_HELP[counter]}")
+            lines.append(f"# TYPE {metric} counter")
+            for stage in STAGES:
+                lines.append(f'{metric}{{stage="{stage}"{extra_labels}}} {counters[stage][counter]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {stage: dict.fromkeys(COUNTERS, 0) for stage in STAGES}
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _zero_clock() -> float:
+    """Stand-in for `time.perf_counter` when instrumentation is disabled"""
+    return 0.0
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from loguru import logger
+
+from sentsplit.segment import SentSplit
+
+
+class MultiSentSplit:
+    """
+    Segment texts of several languages with one `SentSplit` per language, created on first use.
+    Loaded languages are kept in least-recently-used order; when `max_model_bytes` is set and the model files
+    of the loaded languages would exceed it, the least recently used ones are closed to make room.
+    The language in use is always kept loaded, even if its model alone exceeds the cap.
+
+    :param max_model_bytes: cap on the total size of the model files of loaded languages, or None for no cap
+    :param configs: per-language configuration overrides, e.g. `{"ko": {"mincut": 10}}`;
+        languages without a built-in model need a `model` entry here
+    :param kwargs: configuration overrides applied to every language, before the per-language ones
+    """
+
+    def __init__(
+        self,
+        max_model_bytes: int | None = None,
+        configs: dict[str, dict[str, Any]] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.max_model_bytes = max_model_bytes
+        self.configs = configs if configs is not None else {}
+        self.kwargs = kwargs
+        self._sentsplits: OrderedDict[str, SentSplit] = OrderedDict()
+        self._model_bytes: dict[str, int] = {}
+
+    def __enter__(self) -> MultiSentSplit:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def loaded_languages(self) -> list[str]:
+        """Loaded languages, from the least to the most recently used"""
+        return list(self._sentsplits)
+
+    def get(self, lang: str) -> SentSplit:
+        """Return the `SentSplit` of `lang`, loading its model (and evicting others if needed) on first use"""
+        sentsplit = self._sentsplits.get(lang)
+        if sentsplit is not None:
+            self._sentsplits.move_to_end(lang)
+            return sentsplit
+
+        sentsplit = SentSplit(lang, **{**self.kwargs, **self.configs.get(lang, {})})
+        model_bytes = os.path.getsize(sentsplit.config["model"])
+        if self.max_model_bytes is not None:
+            while self._sentsplits and sum(self._model_bytes.values()) + model_bytes > self.max_model_bytes:
+                evicted_lang, evicted = self._sentsplits.popitem(last=False)
+                del self._model_bytes[evicted_lang]
+                evicted.close()
+                logger.info(f"Unloaded the model of {evicted_lang.upper()} to stay within max_model_bytes")
+        self._sentsplits[lang] = sentsplit.warmup()
+        self._model_bytes[lang] = model_bytes
+        return sentsplit
+
+    def segment(self, lang: str, string: str, strip_spaces: bool | None = None) -> list[str]:
+        """Segment a string in language `lang`"""
+        return self.get(lang).segment(string, strip_spaces)
+
+    def segment_batch(self, items: Iterable[tuple[str, str]], strip_spaces: bool | None = None) -> list[list[str]]:
+        """
+        Segment `(lang, string)` pairs and return their sentences in input order.
+        Strings are grouped by language, so that each language is segmented in one `SentSplit.segment_batch` call.
+        """
+        indices_per_lang: dict[str, list[int]] = {}
+        strings = []
+        for index, (lang, string) in enumerate(items):
+            indices_per_lang.setdefault(lang, []).append(index)
+            strings.append(string)
+
+        results: list[list[str]] = [[] for _ in strings]
+        for lang, indices in indices_per_lang.items():
+            sentences_strings = self.get(lang).segment_batch([strings[i] for i in indices], strip_spaces)
+            for index, sentences in zip(indices, sentences_strings):
+                results[index] = sentences
+        return results
+
+    def close(self) -> None:
+        for sentsplit in self._sentsplits.values():
+            sentsplit.close()
+        self._sentsplits.clear()
+        self._model_bytes.clear()
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+from collections import deque
+from functools import partial
+from multiprocessing import Pool
+from typing import Any, Callable, Iterable, Iterator
+
+from tqdm import tqdm
+
+from sentsplit.instrument import _zero_clock
+from sentsplit.segment import _SPARSE_CANDIDATES, SentSplit
+from sentsplit.utils import newline_aligned_byte_ranges
+
+# instances created by `ParallelSegmenter` in this process, inherited by workers started with `fork`
+_parent_sentsplits: dict[int, SentSplit] = {}
+_worker_sentsplit: SentSplit | None = None
+
+
+def _init_worker(key: int, lang: str, config: dict[str, Any]) -> None:
+    """Pool initializer: reuse the parent's instance when it was inherited through `fork`, else load the model"""
+    global _worker_sentsplit
+    _worker_sentsplit = _parent_sentsplits.get(key)
+    if _worker_sentsplit is None:
+        _worker_sentsplit = SentSplit(lang, **config)
+
+
+def _tag_window_in_worker(string: str) -> bytes:
+    """Tag a whole string with the CRF model of the worker, without the regex rules"""
+    return bytes(_worker_sentsplit._tag_crf([string], _zero_clock, [0.0, 0.0, 0.0])[0])
+
+
+class WindowedTagger:
+    """
+    Tag line fragments longer than `min_chars` in overlapping windows, with `map_windows` tagging a list of
+    windows at once, e.g. on a pool of workers; shorter fragments are tagged by the caller's function.
+
+    A long fragment is cut near every `window_chars` characters, at the closest point without punctuation
+    within `ngram` characters, and the text between two cuts is tagged with `overlap` more characters on each
+    side. A cut is kept only if the windows on both sides agree on all the tags they share, except within
+    `ngram` characters of their edges, whose features are cut short; the text around the other cuts is tagged
+    again as one wider window, up to the whole fragment if no cut holds.
+
+    The Viterbi path of a window joins that of the whole fragment a few characters away from its edges, so in
+    practice the stitched tags are those of tagging the fragment at once, but this is not guaranteed: two
+    windows thrown off in the same way over their whole overlap would go unnoticed.
+    """
+
+    def __init__(
+        self,
+        map_windows: Callable[[list[str]], list[bytes]],
+        ngram: int,
+        min_chars: int = 1 << 20,
+        window_chars: int = 1 << 16,
+        overlap: int = 256,
+    ) -> None:
+        assert overlap >= 2 * ngram and window_chars > overlap and min_chars >= window_chars
+        self.map_windows = map_windows
+        self.ngram = ngram
+        self.min_chars = min_chars
+        self.window_chars = window_chars
+        self.overlap = overlap
+        self.num_windows = 0
+        self.num_retagged_windows = 0
+
+    def tag(self, strings: list[str], tag_strings: Callable[[list[str]], list[bytearray]]) -> list[bytearray]:
+        """Tag `strings`, the long ones in windows and the others with `tag_strings`"""
+        short_indices = [index for index, string in enumerate(strings) if len(string) <= self.min_chars]
+        y_tags_strings: list[bytearray] = [bytearray()] * len(strings)
+        for index, y_tags in zip(short_indices, tag_strings([strings[index] for index in short_indices])):
+            y_tags_strings[index] = y_tags
+        for index, string in enumerate(strings):
+            if len(string) > self.min_chars:
+                y_tags_strings[index] = self._tag_long(string)
+        return y_tags_strings
+
+    def _cut_point(self, string: str, nominal: int) -> int:
+        """Return the closest point to `nominal` without punctuation within `ngram` characters, or `nominal`"""
+        for distance in range(self.window_chars // 4):
+            for point in (nominal - distance, nominal + distance):
+                if 0 < point < len(string) and not _SPARSE_CANDIDATES.search(
+                    string, max(0, point - self.ngram), point + self.ngram
+                ):
+                    return point
+        return nominal
+
+    def _tag_long(self, string: str) -> bytearray:
+        length = len(string)
+        cuts = sorted(
+            {0, length}
+            | {self._cut_point(string, nominal) for nominal in range(self.window_chars, length, self.window_chars)}
+        )
+        # (start, end) of the text between two cuts -> (start of its window, tags of the window)
+        windows: dict[tuple[int, int], tuple[int, bytes]] = {}
+        while True:
+            pieces = [piece for piece in zip(cuts, cuts[1:]) if piece not in windows]
+            starts = [max(0, start - self.overlap) for start, _ in pieces]
+            window_strings = [
+                string[window_start : end + self.overlap] for window_start, (_, end) in zip(starts, pieces)
+            ]
+            if len(windows) == 0:
+                self.num_windows += len(pieces)
+            else:
+                self.num_retagged_windows += len(pieces)
+            for piece, window_start, y_tags in zip(pieces, starts, self.map_windows(window_strings)):
+                windows[piece] = (window_start, y_tags)
+
+            held = [0]
+            for previous, cut, following in zip(cuts, cuts[1:], cuts[2:]):
+                left_start, left_tags = windows[(previous, cut)]
+                right_start, right_tags = windows[(cut, following)]
+                start = max(0, cut - self.overlap + self.ngram)
+                end = min(length, cut + self.overlap - self.ngram)
+                if (
+                    left_tags[start - left_start : end - left_start]
+                    == right_tags[start - right_start : end - right_start]
+                ):
+                    held.append(cut)
+            held.append(length)
+            if len(held) == len(cuts):
+                break
+            cuts = held
+
+        y_tags = bytearray(length)
+        for start, end in zip(cuts, cuts[1:]):
+            window_start, window_tags = windows[(start, end)]
+            y_tags[start:end] = window_tags[start - window_start : end - window_start]
+        return y_tags
+
+
+def _read_lines(file_path: str, start: int, end: int, encoding: str) -> list[str]:
+    """Decode the lines in the byte range [start, end) of a memory-mapped file"""
+    with open(file_path, "rb") as inf, mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm)[start:end] as view:
+            text = str(view, encoding)
+    # same newline translation as iterating over a file opened in text mode
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _segment_byte_range(sentsplit: SentSplit, file_path: str, start: int, end: int, encoding: str) -> list[list[str]]:
+    """Segment every line in the byte range [start, end) of a file and return their sentences in order"""
+    return sentsplit.segment_batch(_read_lines(file_path, start, end, encoding))
+
+
+def _encode_sentences(sentences_lines: list[list[str]], encoding: str) -> tuple[bytes, int]:
+    """Encode the sentences one per line and return them with their count"""
+    sentences = [sentence for sentences in sentences_lines for sentence in sentences]
+    data = "".join([f"{sentence}\n" for sentence in sentences]).encode(encoding)
+    return data, len(sentences)
+
+
+def _segment_byte_range_in_worker(file_path: str, start: int, end: int, encoding: str) -> list[list[str]]:
+    return _segment_byte_range(_worker_sentsplit, file_path, start, end, encoding)
+
+
+def _segment_byte_range_to_file(
+    sentsplit: SentSplit, file_path: str, start: int, end: int, encoding: str, output_path: str
+) -> tuple[int, int]:
+    """Segment a byte range into its own output file and return the number of lines and sentences"""
+    sentences_lines = _segment_byte_range(sentsplit, file_path, start, end, encoding)
+    data, num_sentences = _encode_sentences(sentences_lines, encoding)
+    with open(output_path, "wb") as outf:
+        outf.write(data)
+    return len(sentences_lines), num_sentences
+
+
+def _segment_byte_range_to_file_in_worker(
+    file_path: str, start: int, end: int, encoding: str, output_path: str
+) -> tuple[int, int]:
+    return _segment_byte_range_to_file(_worker_sentsplit, file_path, start, end, encoding, output_path)
+
+
+def _has_long_line(file_path: str, start: int, end: int, min_bytes: int) -> bool:
+    """Return whether a line in the byte range [start, end) of a file is longer than `min_bytes`"""
+    with open(file_path, "rb") as inf, mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        line_start = start
+        while line_start < end:
+            newline_index = mm.find(b"\n", line_start, end)
+            line_end = end if newline_index < 0 else newline_index
+            if line_end - line_start > min_bytes:
+                return True
+            line_start = line_end + 1
+    return False
+
+
+class _CompletedResult:
+    """Result computed in this process, queued along the pending results of the pool"""
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def get(self) -> Any:
+        return self.value
+
+
+class ParallelSegmenter:
+    """
+    Segment text files line by line with a pool of worker processes.
+    The memory-mapped input is split into newline-aligned byte ranges of about `shard_size` bytes, and only
+    the offsets are sent to the workers, which decode and segment their ranges with a `SentSplit` set up once
+    by the pool initializer.
+    Results are yielded in input order, and at most `max_pending` ranges are in flight at any time,
+    so memory stays bounded by the shard size rather than the file size.
+
+    With `long_line_chars`, a range with a line longer than that is segmented in this process instead,
+    which tags the line fragments longer than `long_line_chars` in windows of about `window_chars` characters
+    on the workers (see `WindowedTagger`), so that one huge line does not hold up the whole file on one core;
+    the tags of such a line are checked where the windows overlap, but are not guaranteed to be those of
+    tagging it at once.
+    """
+
+    def __init__(
+        self,
+        lang: str,
+        processes: int | None = None,
+        shard_size: int = 1 << 20,
+        max_pending: int | None = None,
+        encoding: str = "utf-8",
+        long_line_chars: int | None = None,
+        window_chars: int = 1 << 16,
+        **kwargs: Any,
+    ) -> None:
+        self.lang = lang
+        self.processes = processes if processes is not None else os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.max_pending = max_pending if max_pending is not None else 2 * self.processes
+        self.encoding = encoding
+        self.kwargs = kwargs
+        assert self.shard_size > 0 and self.max_pending > 0
+
+        # loaded in this process so that configuration errors surface here rather than in every worker
+        self.sentsplit = SentSplit(lang, **kwargs)
+        self._pool = None
+        if self.processes > 1:
+            # load the model before forking, so that the workers share its pages
+            self.sentsplit.warmup()
+            _parent_sentsplits[id(self)] = self.sentsplit
+            self._pool = Pool(
+                processes=self.processes,
+                initializer=_init_worker,
+                initargs=(id(self), lang, kwargs),
+            )
+            if long_line_chars is not None:
+                # set after the workers are forked, which tag the windows themselves
+                self.sentsplit.window_tagger = WindowedTagger(
+                    self._tag_windows, self.sentsplit.config["ngram"], long_line_chars, window_chars
+                )
+
+    def __enter__(self) -> ParallelSegmenter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _tag_windows(self, strings: list[str]) -> list[bytes]:
+        return self._pool.map(_tag_window_in_worker, strings, chunksize=1)
+
+    def _imap_ordered(
+        self, func: Callable[..., Any], tasks: Iterable[tuple], local_func: Callable[..., Any] | None = None
+    ) -> Iterator[Any]:
+        """
+        Apply `func` to each task on the pool and yield the results in order, keeping `max_pending` in flight.
+        Tasks of a byte range with a long line are applied to `local_func` in this process instead.
+        """
+        window_tagger = self.sentsplit.window_tagger
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().get()
+            file_path, start, end = task[:3]
+            if (
+                window_tagger is not None
+                and end - start > window_tagger.min_chars
+                and _has_long_line(file_path, start, end, window_tagger.min_chars)
+            ):
+                # the workers keep segmenting the earlier ranges while they tag the windows of this one
+                pending.append(_CompletedResult(local_func(*task)))
+            else:
+                pending.append(self._pool.apply_async(func, task))
+        while pending:
+            yield pending.popleft().get()
+
+    def iter_file(self, file_path: str) -> Iterator[list[str]]:
+        """Yield the sentences of each line of `file_path`, in order"""
+        byte_ranges = newline_aligned_byte_ranges(file_path, self.shard_size)
+        if self._pool is None:
+            for start, end in byte_ranges:
+                yield from _segment_byte_range(self.sentsplit, file_path, start, end, self.encoding)
+            return
+
+        tasks = [(file_path, start, end, self.encoding) for start, end in byte_ranges]
+        for sentences_lines in self._imap_ordered(
+            _segment_byte_range_in_worker, tasks, partial(_segment_byte_range, self.sentsplit)
+        ):
+            yield from sentences_lines
+
+    def segment_file(self, input_path: str, output_path: str, progress: bool = False) -> tuple[int, int]:
+        """
+        Segment `input_path` and write one sentence per line to `output_path`.
+        With several processes, each worker writes the sentences of its byte range to a shard file,
+        and the shard files are appended to the output in order as they complete.
+        :return: the number of input lines and output sentences
+        """
+        byte_ranges = newline_aligned_byte_ranges(input_path, self.shard_size)
+        num_lines = 0
+        num_sentences = 0
+        progress_bar = tqdm(total=os.path.getsize(input_path), unit="B", unit_scale=True, disable=not progress)
+        with open(output_path, "wb") as outf, progress_bar:
+            if self._pool is None:
+                for start, end in byte_ranges:
+                    sentences_lines = _segment_byte_range(self.sentsplit, input_path, start, end, self.encoding)
+                    data, shard_num_sentences = _encode_sentences(sentences_lines, self.encoding)
+                    outf.write(data)
+                    num_lines += len(sentences_lines)
+                    num_sentences += shard_num_sentences
+                    progress_bar.update(end - start)
+            else:
+                # shard files are placed next to the output, so they share its file system
+                with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as shard_dir:
+                    tasks = [
+                        (input_path, start, end, self.encoding, os.path.join(shard_dir, f"{i}.txt"))
+                        for i, (start, end) in enumerate(byte_ranges)
+                    ]
+                    shard_counts = self._imap_ordered(
+                        _segment_byte_range_to_file_in_worker,
+                        tasks,
+                        partial(_segment_byte_range_to_file, self.sentsplit),
+                    )
+                    for (_, start, end, _, shard_path), (shard_num_lines, shard_num_sentences) in zip(
+                        tasks, shard_counts
+                    ):
+                        with open(shard_path, "rb") as inf:
+                            shutil.copyfileobj(inf, outf)
+                        os.remove(shard_path)
+                        num_lines += shard_num_lines
+                        num_sentences += shard_num_sentences
+                        progress_bar.update(end - start)
+        return num_lines, num_sentences
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self.sentsplit.window_tagger = None
+        _parent_sentsplits.pop(id(self), None)
+        self.sentsplit.close()
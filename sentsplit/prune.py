@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from sentsplit.bench import _time_best
+from sentsplit.crfmodel import CRFModel, read_crfsuite_model, write_crfsuite_model
+from sentsplit.segment import SentSplit
+
+
+def prune_model(
+    model: CRFModel, threshold: float = 0.0, top_k: int | None = None, quantize_bits: int | None = None
+) -> CRFModel:
+    """
+    Return a smaller model without the state features whose absolute weight is below `threshold` or that are not
+    among the `top_k` largest ones, nor the attributes left without features.
+    With `quantize_bits`, the remaining weights (and the transitions) are rounded to `2 ** quantize_bits - 1`
+    levels evenly spaced around zero, and the features rounded to zero are dropped too; CRFsuite still stores
+    the rounded weights as doubles, so this shows the accuracy cost of keeping them in fewer bits.
+    """
+    assert threshold >= 0.0 and (top_k is None or top_k >= 0)
+    assert quantize_bits is None or 2 <= quantize_bits <= 32
+    state_features = [feature for feature in model.state_features if abs(feature[2]) >= threshold]
+    if top_k is not None and len(state_features) > top_k:
+        kept = sorted(range(len(state_features)), key=lambda index: -abs(state_features[index][2]))[:top_k]
+        state_features = [state_features[index] for index in sorted(kept)]
+
+    transitions = [list(row) for row in model.transitions]
+    if quantize_bits is not None:
+        max_weight = max(
+            [abs(weight) for _, _, weight in state_features] + [abs(weight) for row in transitions for weight in row],
+            default=0.0,
+        )
+        if max_weight > 0.0:
+            step = max_weight / (2 ** (quantize_bits - 1) - 1)
+            state_features = [
+                (attribute_id, label_id, round(weight / step) * step)
+                for attribute_id, label_id, weight in state_features
+                if round(weight / step) != 0
+            ]
+            transitions = [[round(weight / step) * step for weight in row] for row in transitions]
+
+    # renumber the remaining attributes in their original order
+    kept_attribute_ids = sorted({attribute_id for attribute_id, _, _ in state_features})
+    attribute_ids = {old_id: new_id for new_id, old_id in enumerate(kept_attribute_ids)}
+    attributes = [model.attributes[old_id] for old_id in kept_attribute_ids]
+    state_features = [
+        (attribute_ids[attribute_id], label_id, weight) for attribute_id, label_id, weight in state_features
+    ]
+    return CRFModel(list(model.labels), attributes, state_features, transitions)
+
+
+def make_heldout_documents(sentences: list[str], doc_sentences: int = 10) -> list[list[str]]:
+    """Group held-out sentences (one per line, as in a training corpus) into documents of `doc_sentences` sentences"""
+    assert doc_sentences > 0
+    sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
+    return [sentences[i : i + doc_sentences] for i in range(0, len(sentences), doc_sentences)]
+
+
+def boundary_scores(sentsplit: SentSplit, documents: list[list[str]], separator: str = " ") -> dict[str, float]:
+    """
+    Return the precision, recall and F1 of the sentence boundaries found by `sentsplit` in the documents,
+    which are their sentences joined with `separator`; the end of a document is not counted as a boundary
+    """
+    texts = [separator.join(sentences) for sentences in documents]
+    num_gold = num_predicted = num_correct = 0
+    for text, sentences, spans in zip(texts, documents, sentsplit.segment_spans_batch(texts, strip_spaces=True)):
+        gold = set()
+        offset = 0
+        for sentence in sentences[:-1]:
+            offset += len(sentence)
+            gold.add(offset)
+            offset += len(separator)
+        predicted = {end for _, end in spans if end < len(text)}
+        num_gold += len(gold)
+        num_predicted += len(predicted)
+        num_correct += len(gold & predicted)
+    precision = num_correct / num_predicted if num_predicted else 1.0
+    recall = num_correct / num_gold if num_gold else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def evaluate_model(
+    lang: str, model_path: str, documents: list[list[str]], separator: str = " ", repeat: int = 3, **kwargs: Any
+) -> dict[str, Any]:
+    """
+    Report the size of a CRFsuite model, the throughput of `tagger.tag` over the held-out documents
+    (whose features are built beforehand) and its boundary scores on them
+    """
+    model = read_crfsuite_model(model_path)
+    splitter = SentSplit(lang, model=model_path, fragment_memo_chars=0, **kwargs).warmup()
+    texts = [separator.join(sentences) for sentences in documents]
+    encoder = splitter._get_encoder()
+    features = [encoder.encode(text) for text in texts]
+    seconds = _time_best(splitter.tagger.tag, lambda: features, repeat)
+    report = {
+        "model": model_path,
+        "model_bytes": os.path.getsize(model_path),
+        "num_attributes": len(model.attributes),
+        "num_state_features": len(model.state_features),
+        "tagging_chars_per_sec": sum(len(text) for text in texts) / seconds if seconds else None,
+        **boundary_scores(splitter, documents, separator),
+    }
+    splitter.close()
+    return report
+
+
+def prune_and_report(
+    lang: str,
+    output_path: str,
+    heldout_sentences: list[str],
+    threshold: float = 0.0,
+    top_k: int | None = None,
+    quantize_bits: int | None = None,
+    doc_sentences: int = 10,
+    repeat: int = 3,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """
+    Prune the model of `lang` (see `prune_model`), write it to `output_path`, and report the size, tagging
+    throughput and boundary scores on held-out sentences of both models, as a JSON-serializable dict.
+    :param kwargs: configuration overrides of `lang`, e.g. `model` and `ngram`
+    """
+    lang_config = SentSplit._resolve_config(lang, kwargs)
+    model_path = lang_config["model"]
+    overrides = {name: value for name, value in kwargs.items() if name != "model"}
+    pruned = prune_model(read_crfsuite_model(model_path), threshold, top_k, quantize_bits)
+    write_crfsuite_model(pruned, output_path)
+
+    documents = make_heldout_documents(heldout_sentences, doc_sentences)
+    before = evaluate_model(lang, model_path, documents, repeat=repeat, **overrides)
+    after = evaluate_model(lang, output_path, documents, repeat=repeat, **overrides)
+    return {
+        "lang": lang,
+        "pruning": {"threshold": threshold, "top_k": top_k, "quantize_bits": quantize_bits},
+        "num_documents": len(documents),
+        "before": before,
+        "after": after,
+    }
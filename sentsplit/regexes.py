@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import regex as re
 from typing_extensions import TypedDict
 
 
@@ -20,3 +25,38 @@ liberal_url = Regex(
     regex=r'\b((?:[a-z][\w\-]+:(?:\/{1,3}|[a-z0-9%])|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}\/)(?:[^\s()<>]|\((?:[^\s()<>]|(?:\([^\s()<>]+\)))*\))+(?:\((?:[^\s()<>]|(?:\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:\'".,<>?«»“”‘’]))',
 )
 period_followed_by_lowercase = Regex(name="period_followed_by_lowercase", regex=r"\.(?= *[a-z])")
+
+
+# literals of which at least one must occur in a string for the pattern to match at all;
+# strings without any of them skip the (possibly expensive) pattern, e.g. `liberal_url` for most sentences
+required_literals = {
+    newline["regex"]: ("\n",),
+    ellipsis["regex"]: ("…",),
+    after_semicolon["regex"]: (";",),
+    # scheme (`:`), `www`, or a domain followed by a path (`/`)
+    liberal_url["regex"]: (":", "www", "/"),
+    period_followed_by_lowercase["regex"]: (".",),
+}
+
+
+class RegexRegistry:
+    """
+    Regexes compiled once and keyed by their `name`s (or by the pattern itself if unnamed)
+    """
+
+    def __init__(self, rgxs: list[Regex]) -> None:
+        self.regexes = rgxs
+        self.patterns: dict[str, re.Pattern] = {}
+        self._entries: list[tuple[Regex, re.Pattern, tuple[str, ...]]] = []
+        for rgx in rgxs:
+            pattern = re.compile(rgx["regex"])
+            self.patterns[rgx.get("name", rgx["regex"])] = pattern
+            self._entries.append((rgx, pattern, required_literals.get(rgx["regex"], ())))
+
+    def finditer(self, string: str) -> Iterator[tuple[Regex, re.Match]]:
+        """Yield `(regex, match)` for the matches of every regex in `string`, regex by regex in the given order"""
+        for rgx, pattern, literals in self._entries:
+            if literals and not any(literal in string for literal in literals):
+                continue
+            for match in pattern.finditer(string):
+                yield rgx, match
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+class ResultCache:
+    """
+    Content-addressed cache of segmentation results, keyed by digests computed by `SentSplit` from the text,
+    the effective config and the model file (see `SentSplit._result_cache_key`).
+
+    Results are kept in an in-memory LRU of at most `max_entries` entries. With `path`, they are also stored in
+    a SQLite database at that path, which survives restarts and can be shared by several processes (e.g. the
+    workers of `ParallelSegmenter`); each process opens its own connection, and the database keeps at most about
+    `max_disk_entries` of the most recently inserted results.
+    """
+
+    # number of inserts into the database between two trims of its oldest entries
+    _TRIM_INTERVAL = 1024
+
+    def __init__(self, max_entries: int = 1 << 16, path: str | None = None, max_disk_entries: int = 1 << 20) -> None:
+        assert max_entries > 0 and max_disk_entries > 0
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[str, ...]] = OrderedDict()
+        self._connection = None
+        self._connection_pid = None
+        self._num_inserts = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict[str, Any]:
+        # a copy sent to another process starts with empty memory and its own database connection
+        return {"max_entries": self.max_entries, "path": self.path, "max_disk_entries": self.max_disk_entries}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_state()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _connect(self):
+        """Return this process' connection to the database, (re)opening it after a fork"""
+        if self._connection is None or self._connection_pid != os.getpid():
+            import sqlite3
+
+            connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, sentences TEXT NOT NULL)")
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def get_many(self, keys: list[bytes]) -> list[list[str] | None]:
+        """Return the cached sentences of each key, or None for keys that are not cached"""
+        results: list[list[str] | None] = []
+        missing = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                sentences = self._entries.get(key)
+                if sentences is None:
+                    results.append(None)
+                    missing.append(index)
+                else:
+                    self._entries.move_to_end(key)
+                    results.append(list(sentences))
+            self.hits += len(keys) - len(missing)
+
+            if missing and self.path is not None:
+                connection = self._connect()
+                for index in missing:
+                    row = connection.execute("SELECT sentences FROM results WHERE key = ?", (keys[index],)).fetchone()
+                    if row is not None:
+                        sentences = json.loads(row[0])
+                        self._put_entry(keys[index], sentences)
+                        results[index] = sentences
+                        self.disk_hits += 1
+            self.misses += sum(1 for index in missing if results[index] is None)
+        return results
+
+    def get(self, key: bytes) -> list[str] | None:
+        return self.get_many([key])[0]
+
+    def _put_entry(self, key: bytes, sentences: list[str]) -> None:
+        self._entries[key] = tuple(sentences)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put_many(self, items: Iterable[tuple[bytes, list[str]]]) -> None:
+        """Cache the sentences of each key, writing them to the database in one transaction"""
+        items = list(items)
+        with self._lock:
+            for key, sentences in items:
+                self._put_entry(key, sentences)
+            if self.path is None or not items:
+                return
+
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO results (key, sentences) VALUES (?, ?)",
+                    [(key, json.dumps(sentences, ensure_ascii=False)) for key, sentences in items],
+                )
+            self._num_inserts += len(items)
+            if self._num_inserts >= self._TRIM_INTERVAL:
+                self._num_inserts = 0
+                self._trim()
+
+    def put(self, key: bytes, sentences: list[str]) -> None:
+        self.put_many([(key, sentences)])
+
+    def _trim(self) -> None:
+        """Delete the oldest inserted entries of the database beyond `max_disk_entries`"""
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            (num_entries,) = connection.execute("SELECT COUNT(*) FROM results").fetchone()
+            if num_entries > self.max_disk_entries:
+                connection.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY rowid LIMIT ?)",
+                    (num_entries - self.max_disk_entries,),
+                )
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters of this process; `hits` include `disk_hits`"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits + self.disk_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results, including those in the database"""
+        with self._lock:
+            self._entries.clear()
+            if self.path is not None:
+                with self._connect() as connection:
+                    connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -1,20 +1,138 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import math
 import pprint
+import time
+from bisect import bisect_left
+from collections import OrderedDict
 from copy import deepcopy
+from functools import partial
 from pathlib import Path
-from typing import Any, Union
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Union
 
 import pycrfsuite
 import regex as re
 from loguru import logger
 
 from sentsplit import config, regexes
-from sentsplit.regexes import Regex
-from sentsplit.train import _PUNCTUATIONS, _sample_to_features
+from sentsplit.crfmodel import is_exported_model, read_crfsuite_model
+from sentsplit.instrument import Instrumentation, _zero_clock
+from sentsplit.regexes import Regex, RegexRegistry
+from sentsplit.result_cache import ResultCache
+from sentsplit.train import _PUNCTUATIONS, _CharFeatureEncoder
 from sentsplit.utils import split_keep_multiple_separators
 
+if TYPE_CHECKING:
+    from sentsplit.engine import EmissionTagger
+    from sentsplit.parallel import WindowedTagger
+
+# heuristic regexes to segment a maxcut string, in decreasing order of importance
+_MAXCUT_HEURISTICS = [
+    re.compile(rgx)
+    for rgx in (
+        r'(?<=[\.。︀?？!！…])[\'"’”❜❞›»❯」』)）\]］】〟]',  # punctuation and closing
+        r'(?<=[\'"’”❜❞›»❯」』)）\]］】〟])[\.。︀?？!！…]',  # closing and punctuation
+        r"(?<=\s)\p{Pd}",  # space and dash
+        r"[:﹕：;﹔；؛⁏]",  # colon
+        r'(?<=[^\s])[\'"’”❜❞›»❯」』)）\]］】〟](?=\s)',  # not space and closing and space
+        r"[,，﹐]",  # comma
+        r"[’”❜❞›»❯」』)）\]］】〟]",  # closing
+        r"\s",  # whitespace
+    )
+]
+
+_MULTIPLE_SPACES = re.compile(r"\s{2,}")
+
+# candidate sentence boundaries of sparse tagging: runs of punctuation, including closing quotes and brackets
+_SPARSE_CANDIDATES = re.compile(r"\p{P}+")
+
+# after tagging, tags of a string are kept in a compact bytearray with one byte per character
+_O = 0
+_EOS = 1
+_TAG_CODES = {"O": _O, "EOS": _EOS}
+
+
+def _iter_eos(y_tags: bytearray, end: int | None = None) -> Iterator[int]:
+    """Yield the indices tagged 'EOS' in `y_tags[:end]`"""
+    index = y_tags.find(_EOS, 0, end)
+    while index >= 0:
+        yield index
+        index = y_tags.find(_EOS, index + 1, end)
+
+
+class _SpaceOffsets:
+    """
+    Offset mapping between a string and its multiple-space-substituted form,
+    where every run of whitespaces in `spans` (indices of the original string) was replaced by a single space
+    """
+
+    def __init__(self, spans: list[tuple[int, int]]) -> None:
+        self.spans = spans
+        # index of each run's single space in the substituted string, and the number of characters removed before it
+        self._space_indices = []
+        self._num_removed = [0]
+        for start, end in spans:
+            self._space_indices.append(start - self._num_removed[-1])
+            self._num_removed.append(self._num_removed[-1] + end - start - 1)
+
+    def to_original(self, index: int) -> int:
+        """Map an index of the substituted string to the original string"""
+        return index + self._num_removed[bisect_left(self._space_indices, index)]
+
+    def restore_tags(self, y_tags: bytearray) -> bytearray:
+        """Map tags of the substituted string to the original string, tagging the restored spaces with 'O'"""
+        if not self.spans:
+            return y_tags
+        restored = bytearray(len(y_tags) + self._num_removed[-1])
+        for index in _iter_eos(y_tags):
+            restored[self.to_original(index)] = _EOS
+        return restored
+
+
+class _FragmentMemo:
+    """
+    LRU memo of the final tags of line fragments, bounded by the total number of characters of the fragments.
+    `misses` counts the fragments that had to be tagged, and `hits` those that did not.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._tags: OrderedDict[str, bytes] = OrderedDict()
+        self._num_chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fragment: str) -> bytes | None:
+        tags = self._tags.get(fragment)
+        if tags is not None:
+            self._tags.move_to_end(fragment)
+        return tags
+
+    def put(self, fragment: str, tags: bytes) -> None:
+        if len(fragment) > self.max_chars or fragment in self._tags:
+            return
+        self._tags[fragment] = tags
+        self._num_chars += len(fragment)
+        while self._num_chars > self.max_chars:
+            evicted, _ = self._tags.popitem(last=False)
+            self._num_chars -= len(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._tags),
+            "chars": self._num_chars,
+        }
+
+    def clear(self) -> None:
+        self._tags.clear()
+        self._num_chars = 0
+
 
 class SentSplit:
     """Sentence segmentation using CRF models with configurable rules.
@@ -23,20 +141,102 @@ class SentSplit:
     for unsupported languages.
     """
 
-    def __init__(self, lang: str, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        lang: str,
+        result_cache: ResultCache | None = None,
+        fragment_memo_chars: int = 1 << 18,
+        instrumentation: Instrumentation | None = None,
+        engine: str = "crfsuite",
+        sparse_context: int | None = None,
+        window_tagger: WindowedTagger | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Initialize SentSplit for a given language.
 
         :param lang: ISO language code (e.g., 'en', 'fr', 'ko') or custom language
+        :param result_cache: optional cache of segmentation results, which may be shared between instances
+        :param fragment_memo_chars: capacity, in characters, of the memo of tags of repeated line fragments;
+            0 disables it
+        :param instrumentation: optional per-stage timing and counters, see `sentsplit.instrument`
+        :param engine: "crfsuite" to tag with `pycrfsuite.Tagger`, or "numpy" to tag with the same results
+            from precomputed emission tables (see `sentsplit.engine`), much faster for batches; requires NumPy
+        :param sparse_context: if set, only windows of `sparse_context` characters (at least `ngram`) on each
+            side of punctuation are tagged by the CRF model, and the other characters are tagged 'O'; this cuts
+            the tagging work on long prose, at the cost of boundaries found away from punctuation, so check
+            a language with `sentsplit bench --sparse_context` before relying on it
+        :param window_tagger: optional `sentsplit.parallel.WindowedTagger` that tags very long line fragments
+            in overlapping windows on several workers; the windows are checked to agree where they overlap, which
+            gives the tags of tagging the fragments at once in practice, but not with certainty
         :param kwargs: Configuration overrides including 'model' path for custom models
 
         :raises FileNotFoundError: If model file does not exist
         :raises ValueError: If required parameters are missing
         """
+        if engine not in ("crfsuite", "numpy"):
+            raise ValueError(f"engine must be 'crfsuite' or 'numpy', not {engine!r}")
         self.lang = lang
+        self.engine = engine
+        self.config = SentSplit._resolve_config(lang, kwargs)
+        if engine != "numpy" and is_exported_model(self.config["model"]):
+            raise ValueError(f"The exported model {self.config['model']} can only be used with engine='numpy'")
+        if sparse_context is not None and sparse_context < self.config["ngram"]:
+            raise ValueError(f"sparse_context must be at least ngram={self.config['ngram']}, not {sparse_context}")
+        self.sparse_context = sparse_context
+        self.window_tagger = window_tagger
+
+        # the tagger is opened on first use, see `tagger` and `warmup()`
+        self._tagger: pycrfsuite.Tagger | None = None
+        self._encoder: _CharFeatureEncoder | None = None
+        self._emission_tagger: EmissionTagger | None = None
+
+        self.result_cache = result_cache
+        self._result_cache_digest: bytes | None = None
+        self._fragment_memo = _FragmentMemo(fragment_memo_chars) if fragment_memo_chars > 0 else None
+        self.instrumentation = instrumentation
+
+        # Fill regexes
+        self._fill_regexes()
+
+        # the config is only formatted if a log handler accepts the message
+        logger.opt(lazy=True).info(
+            "SentSplit for {} loaded:\n{}",
+            lambda: self.lang.upper(),
+            lambda: pprint.pformat(self.config, indent=2),
+        )
+
+    @property
+    def tagger(self) -> pycrfsuite.Tagger:
+        if self._tagger is None:
+            self._tagger = self._load_model(self.config["model"])
+        return self._tagger
+
+    def warmup(self) -> SentSplit:
+        """Open the model and prepare the feature encoder now instead of on the first call to `segment()`"""
+        if self.engine == "numpy":
+            self._get_emission_tagger()
+        else:
+            self.tagger  # opens the model
+            self._get_encoder()
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _resolve_config(lang: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Merge the configuration overrides in `kwargs` into the default config of `lang`,
+        with `model` resolved to the path of an existing model file
+        """
+        kwargs = dict(kwargs)
 
         # Get appropriate config and is_builtin_model
         try:
-            default_config = deepcopy(getattr(config, f"{self.lang}_config"))
+            default_config = deepcopy(getattr(config, f"{lang}_config"))
             is_builtin_model = True
         except AttributeError:
             default_config = deepcopy(getattr(config, "base_config"))
@@ -56,9 +256,7 @@ class SentSplit:
             if k not in default_config and k != "model":
                 logger.warning(f"`{k}` not in config, skipped")
                 continue
-            default_config[k] = v
-
-        self.config = default_config
+            default_config[k] = deepcopy(v)
 
         # Validate model path
         if is_builtin_model:
@@ -67,30 +265,17 @@ class SentSplit:
             model_path = package_root / model_path
 
             if model_path.is_file():
-                self.config["model"] = str(model_path)  # Convert it to str if it is Path object
+                default_config["model"] = str(model_path)  # Convert it to str if it is Path object
             else:
                 raise FileNotFoundError(f"Built-in model not found: {model_path}")
         else:
             if model_path.is_file():
-                self.config["model"] = str(model_path)
+                default_config["model"] = str(model_path)
                 logger.info(f"Using custom model: {model_path}")
             else:
                 raise FileNotFoundError(f"Model file not found: {model_path}")
 
-        # Load tagger
-        self.tagger = self._load_model(self.config["model"])
-
-        # Fill regexes
-        self._fill_regexes()
-
-        config_string = pprint.pformat(self.config, indent=2)
-        logger.info(f"SentSplit for {self.lang.upper()} loaded:\n{config_string}")
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exception_type, exception_value, traceback):
-        self.close()
+        return default_config
 
     @staticmethod
     def _load_model(model_path: str) -> pycrfsuite.Tagger:
@@ -100,7 +285,7 @@ class SentSplit:
 
     def _fill_regexes(self) -> None:
         """
-        Retrieve actual regexes from `regexes.py` by their `name`s if not given
+        Retrieve actual regexes from `regexes.py` by their `name`s if not given, and compile them
         """
         for rgx_index, rgx in enumerate(self.config["segment_regexes"]):
             if "regex" not in rgx:
@@ -108,94 +293,472 @@ class SentSplit:
         for rgx_index, rgx in enumerate(self.config["prevent_regexes"]):
             if "regex" not in rgx:
                 self.config["prevent_regexes"][rgx_index] = getattr(regexes, rgx["name"])
+        self._segment_regexes = RegexRegistry(self.config["segment_regexes"])
+        self._prevent_regexes = RegexRegistry(self.config["prevent_regexes"])
 
     def segment(self, string: Union[str, list[str]], strip_spaces: bool | None = None) -> list[str]:
-        if strip_spaces is None:
-            strip_spaces = self.config["strip_spaces"]
-        else:
-            assert isinstance(strip_spaces, bool), "`strip_spaces` must be a boolean value"
+        strip_spaces = self._resolve_strip_spaces(strip_spaces)
 
         if isinstance(string, str):
-            result = self._segment(string, strip_spaces)
+            if self.result_cache is None:
+                result = self._segment(string, strip_spaces)
+            else:
+                key = self._result_cache_key(string, strip_spaces)
+                result = self.result_cache.get(key)
+                if result is None:
+                    result = self._segment(string, strip_spaces)
+                    self.result_cache.put(key, result)
         else:
             assert isinstance(string, list)
-            result = [self._segment(t, strip_spaces) for t in string]
+            result = self.segment_batch(string, strip_spaces)
         return result
 
+    def segment_batch(self, strings: Iterable[str], strip_spaces: bool | None = None) -> list[list[str]]:
+        """
+        Segment many strings in one call and return their sentences in input order.
+        Line fragments of all strings are pooled and deduplicated, so a fragment that occurs several times
+        in the batch is featurized, tagged and matched against the regexes only once.
+        """
+        strip_spaces = self._resolve_strip_spaces(strip_spaces)
+        if self.result_cache is None:
+            return self._segment_batch(strings, strip_spaces)
+
+        strings = list(strings)
+        keys = [self._result_cache_key(string, strip_spaces) for string in strings]
+        results = self.result_cache.get_many(keys)
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            sentences_missing = self._segment_batch([strings[index] for index in missing], strip_spaces)
+            for index, sentences in zip(missing, sentences_missing):
+                results[index] = sentences
+            self.result_cache.put_many([(keys[index], results[index]) for index in missing])
+        return results
+
+    def _result_cache_key(self, string: str, strip_spaces: bool) -> bytes:
+        """
+        Digest of `string` and everything else that determines its sentences:
+        the contents of the model file, the config, `sparse_context` and `strip_spaces`
+        """
+        if self._result_cache_digest is None:
+            digest = hashlib.blake2b(digest_size=32)
+            with open(self.config["model"], "rb") as inf:
+                digest.update(inf.read())
+            config = {k: v for k, v in self.config.items() if k != "model"}
+            if self.sparse_context is not None:
+                config["sparse_context"] = self.sparse_context
+            digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+            self._result_cache_digest = digest.digest()
+        key = self._result_cache_digest + (b"\x01" if strip_spaces else b"\x00")
+        return hashlib.blake2b(string.encode("utf-8", "surrogatepass"), digest_size=16, key=key).digest()
+
+    def segment_spans(self, string: str, strip_spaces: bool | None = None) -> list[tuple[int, int]]:
+        """
+        Segment `string` like `segment`, but return the `(start, end)` offsets of its sentences into `string`,
+        so that `[string[start:end] for start, end in spans] == segment(string)`. Sentences are not built, and
+        when `strip_spaces` applies the offsets exclude the stripped spaces.
+        Use `utils.char_spans_to_byte_spans` to slice the encoded text instead.
+        """
+        return self._segment_spans(string, self._resolve_strip_spaces(strip_spaces))
+
+    def segment_spans_batch(
+        self, strings: Iterable[str], strip_spaces: bool | None = None
+    ) -> list[list[tuple[int, int]]]:
+        """`segment_spans` of many strings, which are segmented together as in `segment_batch`"""
+        return self._segment_spans_batch(strings, self._resolve_strip_spaces(strip_spaces))
+
+    def _segment_batch(self, strings: Iterable[str], strip_spaces: bool) -> list[list[str]]:
+        strings = list(strings)
+        return [
+            [string[start:end] for start, end in spans]
+            for string, spans in zip(strings, self._segment_spans_batch(strings, strip_spaces))
+        ]
+
+    def _segment_spans_batch(self, strings: Iterable[str], strip_spaces: bool) -> list[list[tuple[int, int]]]:
+        instrumentation = self.instrumentation
+        clock = _zero_clock if instrumentation is None else time.perf_counter
+        start_time = clock()
+        fragments_per_string = [split_keep_multiple_separators(string, ["\n"]) for string in strings]
+        if instrumentation is not None:
+            num_chars = sum(len(fragment) for fragments in fragments_per_string for fragment in fragments)
+            instrumentation.record("split", clock() - start_time, chars=num_chars)
+
+        fragment_indices: dict[str, int] = {}
+        for fragments in fragments_per_string:
+            for fragment in fragments:
+                fragment_indices.setdefault(fragment, len(fragment_indices))
+        unique_fragments = list(fragment_indices)
+
+        y_tags_fragments = self._tag_strings(unique_fragments)
+        # fragments are segmented independently of each other, so their spans can be shared
+        start_time = clock()
+        stats = None if instrumentation is None else {"maxcut_fallbacks": 0}
+        spans_fragments = [
+            SentSplit._spans_by_char_tag(
+                [fragment],
+                [y_tags],
+                strip_spaces,
+                self.config["maxcut"],
+                self.config["mincut"],
+                stats,
+            )
+            for fragment, y_tags in zip(unique_fragments, y_tags_fragments)
+        ]
+        if instrumentation is not None:
+            instrumentation.record(
+                "segment_by_char_tag",
+                clock() - start_time,
+                chars=sum(len(fragment) for fragment in unique_fragments),
+                sentences=sum(len(spans) for spans in spans_fragments),
+                **stats,
+            )
+
+        results = []
+        for fragments in fragments_per_string:
+            spans_string = []
+            offset = 0
+            for fragment in fragments:
+                spans = spans_fragments[fragment_indices[fragment]]
+                if offset:
+                    spans_string.extend((start + offset, end + offset) for start, end in spans)
+                else:
+                    spans_string.extend(spans)
+                offset += len(fragment)
+            results.append(spans_string)
+        return results
+
+    def iter_segments(
+        self,
+        chunks: Union[Iterable[str], IO[str]],
+        strip_spaces: bool | None = None,
+        max_buffer_size: int | None = None,
+        chunk_size: int = 1 << 16,
+    ) -> Iterator[str]:
+        """
+        Lazily segment a stream of text and yield sentences as soon as their boundaries are final.
+        Lines are segmented independently of each other, so every sentence of a line is final once its line feed
+        has been read, and the sentences are the same as those of `segment("".join(chunks))`.
+        The unfinished tail of a line is carried over to the next chunk. Once it grows beyond `max_buffer_size`
+        characters (default: 4 * `maxcut`), it is segmented early and only the sentences ending at least `maxcut`
+        characters before its end are yielded, so memory stays bounded even for a line of several GBs;
+        only for such over-long lines may the boundaries around the early cuts differ from `segment`.
+        :param chunks: an iterable of text chunks of any size, or a text file object that is read by `chunk_size`
+        """
+        strip_spaces = self._resolve_strip_spaces(strip_spaces)
+        if max_buffer_size is None:
+            max_buffer_size = 4 * self.config["maxcut"]
+        if hasattr(chunks, "read"):
+            chunks = iter(partial(chunks.read, chunk_size), "")
+
+        pending: list[str] = []  # pieces of the unfinished tail, i.e. text after the last line feed
+        pending_length = 0
+        for chunk in chunks:
+            last_line_feed = chunk.rfind("\n")
+            if last_line_feed >= 0:
+                pending.append(chunk[: last_line_feed + 1])
+                yield from self._segment("".join(pending), strip_spaces)
+                chunk = chunk[last_line_feed + 1 :]
+                pending = []
+                pending_length = 0
+            if chunk:
+                pending.append(chunk)
+                pending_length += len(chunk)
+            if pending_length > max_buffer_size:
+                tail = "".join(pending)
+                sentences, num_consumed = self._segment_unfinished(tail, strip_spaces)
+                yield from sentences
+                pending = [tail[num_consumed:]]
+                pending_length -= num_consumed
+        yield from self._segment("".join(pending), strip_spaces)
+
+    def _segment_unfinished(self, tail: str, strip_spaces: bool) -> tuple[list[str], int]:
+        """
+        Segment `tail`, a line whose end has not been read yet, and return the sentences that end at least
+        `maxcut` characters before the end of `tail` together with the number of characters they cover
+        """
+        final_length = len(tail) - self.config["maxcut"]
+        sentences = []
+        num_consumed = 0
+        # segment without stripping so that sentence lengths add up to character offsets
+        for sentence in self._segment(tail, strip_spaces=False):
+            if num_consumed + len(sentence) > final_length:
+                break
+            num_consumed += len(sentence)
+            if strip_spaces:
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+            sentences.append(sentence)
+        return sentences, num_consumed
+
+    def _resolve_strip_spaces(self, strip_spaces: bool | None) -> bool:
+        if strip_spaces is None:
+            return self.config["strip_spaces"]
+        assert isinstance(strip_spaces, bool), "`strip_spaces` must be a boolean value"
+        return strip_spaces
+
     def _segment(self, original_string: str, strip_spaces: bool) -> list[str]:
         """This method deals with a single string"""
+        return [original_string[start:end] for start, end in self._segment_spans(original_string, strip_spaces)]
+
+    def _segment_spans(self, original_string: str, strip_spaces: bool) -> list[tuple[int, int]]:
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            return self._segment_spans_instrumented(original_string, strip_spaces, instrumentation)
         # initially segment by line feeds
         strings = split_keep_multiple_separators(original_string, ["\n"])
+        y_tags_strings = self._tag_strings(strings)
+        results = SentSplit._spans_by_char_tag(
+            strings,
+            y_tags_strings,
+            strip_spaces,
+            self.config["maxcut"],
+            self.config["mincut"],
+        )
+        return results
 
-        chars_strings = []  # list of original characters per string
-        features_strings = []  # list of character n-gram features per string
-        multiple_spaces_positions_strings = []  # list of tuples(match, start_ind, end_ind) per string
+    def _segment_spans_instrumented(
+        self, original_string: str, strip_spaces: bool, instrumentation: Instrumentation
+    ) -> list[tuple[int, int]]:
+        """`_segment_spans` reporting the split and segment_by_char_tag stages; tagging stages report in `_tag_strings`"""
+        start_time = time.perf_counter()
+        strings = split_keep_multiple_separators(original_string, ["\n"])
+        instrumentation.record("split", time.perf_counter() - start_time, chars=len(original_string))
+        y_tags_strings = self._tag_strings(strings)
+        start_time = time.perf_counter()
+        stats = {"maxcut_fallbacks": 0}
+        results = SentSplit._spans_by_char_tag(
+            strings,
+            y_tags_strings,
+            strip_spaces,
+            self.config["maxcut"],
+            self.config["mincut"],
+            stats,
+        )
+        instrumentation.record(
+            "segment_by_char_tag",
+            time.perf_counter() - start_time,
+            chars=len(original_string),
+            sentences=len(results),
+            **stats,
+        )
+        return results
 
-        for string in strings:
-            chars_strings.append([c for c in string])
-            if self.config["handle_multiple_spaces"]:
-                # replace multiple spaces with a single space for better segmentation by CRF model
-                (
-                    preprocessed_string,
-                    multiple_spaces_positions,
-                ) = SentSplit._substitute_multiple_spaces(string)
-                multiple_spaces_positions_strings.append(multiple_spaces_positions)
-                # convert the string into character n-gram features
-                features_strings.append(_sample_to_features([c for c in preprocessed_string], self.config["ngram"]))
-            else:
-                # convert the string into character n-gram features
-                features_strings.append(_sample_to_features([c for c in string], self.config["ngram"]))
+    def fragment_memo_stats(self) -> dict[str, Any] | None:
+        """Return hit/miss counters and the size of the memo of line fragment tags, or None if it is disabled"""
+        return None if self._fragment_memo is None else self._fragment_memo.stats()
 
-        # tag strings
-        y_tags_strings = [self.tagger.tag(f_s) for f_s in features_strings]
+    def _tag_strings(self, strings: list[str]) -> list[bytearray]:
+        """
+        Tag each of `strings` with the CRF model and then apply the regex rules.
+        The final tags of each string are memoized, so a repeated line fragment is tagged only once.
+        """
+        memo = self._fragment_memo
+        if memo is None:
+            return self._tag_strings_uncached(strings)
+
+        memoized = [memo.get(string) for string in strings]
+        missing = list(dict.fromkeys(string for string, tags in zip(strings, memoized) if tags is None))
+        memo.hits += len(strings) - len(missing)
+        memo.misses += len(missing)
+        if not missing:
+            return [bytearray(tags) for tags in memoized]
+        computed = dict(zip(missing, self._tag_strings_uncached(missing)))
+        for string, y_tags in computed.items():
+            memo.put(string, bytes(y_tags))
+        return [computed[string] if tags is None else bytearray(tags) for string, tags in zip(strings, memoized)]
+
+    def _tag_strings_uncached(self, strings: list[str]) -> list[bytearray]:
+        multiple_spaces_offsets_strings = []  # list of offset mappings of the substituted spaces per string
+
+        instrumentation = self.instrumentation
+        clock = _zero_clock if instrumentation is None else time.perf_counter
+        # cumulative seconds of substitute_multiple_spaces, features and tag
+        stage_seconds = [0.0, 0.0, 0.0]
+        start_time = clock()
+        if self.config["handle_multiple_spaces"]:
+            # replace multiple spaces with a single space for better segmentation by CRF model
+            preprocessed_strings = []
+            for string in strings:
+                preprocessed_string, multiple_spaces_offsets = SentSplit._substitute_multiple_spaces(string)
+                preprocessed_strings.append(preprocessed_string)
+                multiple_spaces_offsets_strings.append(multiple_spaces_offsets)
+        else:
+            preprocessed_strings = strings
+        stage_seconds[0] = clock() - start_time
+
+        if self.sparse_context is not None:
+            y_tags_strings = self._tag_crf_sparse(preprocessed_strings, clock, stage_seconds)
+        elif self.window_tagger is not None:
+            y_tags_strings = self.window_tagger.tag(
+                preprocessed_strings, partial(self._tag_crf, clock=clock, stage_seconds=stage_seconds)
+            )
+        else:
+            y_tags_strings = self._tag_crf(preprocessed_strings, clock, stage_seconds)
 
+        start_time = clock()
         if self.config["handle_multiple_spaces"]:
             # adjust y_tags_strings to account for the removed multiple spaces
-            y_tags_strings = SentSplit._adjust_tags_for_multiple_spaces(y_tags_strings, multiple_spaces_positions_strings)
+            y_tags_strings = SentSplit._adjust_tags_for_multiple_spaces(y_tags_strings, multiple_spaces_offsets_strings)
+        adjusted_time = clock()
 
-        y_tags_strings = SentSplit._tag_segment_regexes(y_tags_strings, strings, self.config["segment_regexes"])
+        stats = None if instrumentation is None else {"regex_matches": 0}
+        y_tags_strings = SentSplit._tag_segment_regexes(y_tags_strings, strings, self._segment_regexes, stats)
+        segment_regexes_time = clock()
+        num_segment_matches = 0 if stats is None else stats["regex_matches"]
         y_tags_strings = SentSplit._tag_prevent_regexes(
             y_tags_strings,
             strings,
-            self.config["prevent_regexes"],
+            self._prevent_regexes,
             self.config["maxcut"],
             self.config["prevent_word_split"],
+            stats,
         )
-        results = SentSplit._segment_by_char_tag(
-            chars_strings,
-            y_tags_strings,
-            strip_spaces,
-            self.config["maxcut"],
-            self.config["mincut"],
+
+        if instrumentation is not None:
+            prevent_regexes_time = clock()
+            num_chars = sum(len(string) for string in strings)
+            if self.config["handle_multiple_spaces"]:
+                instrumentation.record("substitute_multiple_spaces", stage_seconds[0], chars=num_chars)
+            instrumentation.record("features", stage_seconds[1], chars=num_chars)
+            instrumentation.record(
+                "tag", stage_seconds[2], chars=num_chars, tags=sum(len(y_tags) for y_tags in y_tags_strings)
+            )
+            if self.config["handle_multiple_spaces"]:
+                instrumentation.record("adjust_multiple_spaces", adjusted_time - start_time, chars=num_chars)
+            instrumentation.record(
+                "segment_regexes",
+                segment_regexes_time - adjusted_time,
+                chars=num_chars,
+                regex_matches=num_segment_matches,
+            )
+            instrumentation.record(
+                "prevent_regexes",
+                prevent_regexes_time - segment_regexes_time,
+                chars=num_chars,
+                regex_matches=stats["regex_matches"] - num_segment_matches,
+            )
+        return y_tags_strings
+
+    def _tag_crf(self, strings: list[str], clock: Callable[[], float], stage_seconds: list[float]) -> list[bytearray]:
+        """Tag `strings` with the CRF model, adding the time spent to `stage_seconds` (features and tag)"""
+        if self.engine == "numpy":
+            # gathering the emission scores of the characters stands for building their features
+            emission_tagger = self._get_emission_tagger()
+            start_time = clock()
+            scores, offsets = emission_tagger.emissions(strings)
+            featurized_time = clock()
+            y_tags_strings = emission_tagger.decode(scores, offsets)
+            stage_seconds[1] += featurized_time - start_time
+            stage_seconds[2] += clock() - featurized_time
+            return y_tags_strings
+
+        y_tags_strings = []
+        encoder = self._get_encoder()
+        for string in strings:
+            start_time = clock()
+            xseq = encoder.encode(string)
+            featurized_time = clock()
+            y_tags = self.tagger.tag(xseq)
+            stage_seconds[1] += featurized_time - start_time
+            stage_seconds[2] += clock() - featurized_time
+            y_tags_strings.append(bytearray(map(_TAG_CODES.__getitem__, y_tags)))
+        return y_tags_strings
+
+    def _tag_crf_sparse(
+        self, strings: list[str], clock: Callable[[], float], stage_seconds: list[float]
+    ) -> list[bytearray]:
+        """
+        Tag only the candidate windows of `strings` with the CRF model, each as a string of its own.
+        A window is tagged with `ngram` more characters on each side, whose tags are dropped, so that the features
+        of its characters are those they have in the whole string and it is not taken for the end of a sample.
+        """
+        margin = self.config["ngram"]
+        windows_strings = [SentSplit._candidate_windows(string, self.sparse_context, margin) for string in strings]
+        window_tags = iter(
+            self._tag_crf(
+                [
+                    string[max(0, start - margin) : end + margin]
+                    for string, windows in zip(strings, windows_strings)
+                    for start, end in windows
+                ],
+                clock,
+                stage_seconds,
+            )
         )
-        return results
+        y_tags_strings = []
+        for string, windows in zip(strings, windows_strings):
+            y_tags = bytearray(len(string))
+            for start, end in windows:
+                offset = start - max(0, start - margin)
+                y_tags[start:end] = next(window_tags)[offset : offset + end - start]
+            y_tags_strings.append(y_tags)
+        return y_tags_strings
 
     @staticmethod
-    def _substitute_multiple_spaces(line: str) -> tuple[str, list[tuple[int, int]]]:
+    def _candidate_windows(string: str, context: int, margin: int = 0) -> list[tuple[int, int]]:
         """
-        Substitute multiple spaces with a single space and record their indices so that they can be restored later
-        multiple_spaces_positions: [(start_ind, end_ind), ..]
+        Return the (start, end) offsets of `context` characters around runs of punctuation, merged when their
+        margins of `margin` characters would overlap
         """
-        positions = []
+        windows: list[tuple[int, int]] = []
+        for match in _SPARSE_CANDIDATES.finditer(string):
+            start = max(0, match.start() - context)
+            end = min(len(string), match.end() + context)
+            if windows and start - windows[-1][1] <= 2 * margin:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+        return windows
 
-        def repl(match: re.Match) -> str:
-            positions.append(match.span(0))
-            return " "
+    def _tag(self, string: str) -> list[str]:
+        """
+        Tag `string` with the CRF model.
+        Character n-gram features are built as UTF-8 keys resolved against the model's attribute dictionary,
+        i.e. in the form the tagger consumes without re-encoding each feature.
+        """
+        return self.tagger.tag(self._get_encoder().encode(string))
 
-        # Perform the substitution in one pass while recording positions
-        new_line = re.sub(r"\s{2,}", repl, line)
+    def _get_emission_tagger(self) -> EmissionTagger:
+        """Return the `sentsplit.engine.EmissionTagger` of the model, building its tables on first use"""
+        if self._emission_tagger is None:
+            from sentsplit.engine import EmissionTagger
 
-        return new_line, positions
+            self._emission_tagger = EmissionTagger.from_model_file(self.config["model"], self.config["ngram"])
+        return self._emission_tagger
+
+    def _get_encoder(self) -> _CharFeatureEncoder:
+        if self._encoder is None:
+            # the attribute dictionary of the model, read from its file, which is faster than `tagger.info()`
+            attributes = frozenset(read_crfsuite_model(self.config["model"]).attributes)
+            self._encoder = _CharFeatureEncoder(self.config["ngram"], attributes=attributes, as_bytes=True)
+        return self._encoder
+
+    @staticmethod
+    def _substitute_multiple_spaces(line: str) -> tuple[str, _SpaceOffsets]:
+        """
+        Substitute multiple spaces with a single space and record their positions so that they can be restored later
+        """
+        spans = [match.span(0) for match in _MULTIPLE_SPACES.finditer(line)]
+        if not spans:
+            return line, _SpaceOffsets(spans)
+        pieces = []
+        last_end = 0
+        for start, end in spans:
+            pieces.append(line[last_end:start])
+            pieces.append(" ")
+            last_end = end
+        pieces.append(line[last_end:])
+        return "".join(pieces), _SpaceOffsets(spans)
 
     @staticmethod
     def _adjust_tags_for_multiple_spaces(
-        y_tags_strings: list[list[str]],
-        multiple_spaces_positions_strings: list[list[tuple[int, int]]],
-    ) -> list[list[str]]:
+        y_tags_strings: list[bytearray],
+        multiple_spaces_offsets_strings: list[_SpaceOffsets],
+    ) -> list[bytearray]:
         """
         So far y_tags_strings contains labels (tags) for the multiple-space-substituted strings
-        This method adds back (`len_matched_spaces` - 1) 'O' tags after the substituted single space to restore original strings
-        Note that `start_char_ind` and `end_char_ind` are character-level indices of the original strings
+        This method restores (`len_matched_spaces` - 1) 'O' tags after each substituted single space
+        to match the original strings, in a single pass per string
         Example:
             Input:
                 (original) string: 'It is good.   Ha'
@@ -205,193 +768,218 @@ class SentSplit:
                 (Restores the three spaces after '~ good.'
                 y_tags_string: ['O', 'O', 'O', 'O', 'O', 'O', 'O', 'O', 'O', 'O', 'EOS', 'O', 'O', 'O', 'O','O']
         """
-        assert len(y_tags_strings) == len(multiple_spaces_positions_strings)
-        for string_index, multiple_spaces_positions in enumerate(multiple_spaces_positions_strings):
-            y_tags = y_tags_strings[string_index]
-            for start_char_ind, end_char_ind in multiple_spaces_positions:
-                len_matched_spaces = end_char_ind - start_char_ind
-                # y_tags already contains an 'O' for one space, hence subtract 1
-                o_tags_for_matched_spaces = ["O"] * (len_matched_spaces - 1)
-                # insert 'O's after the index of the substituted single space
-                y_tags = y_tags[: start_char_ind + 1] + o_tags_for_matched_spaces + y_tags[start_char_ind + 1 :]
-            y_tags_strings[string_index] = y_tags
-        return y_tags_strings
+        assert len(y_tags_strings) == len(multiple_spaces_offsets_strings)
+        return [
+            offsets.restore_tags(y_tags) for y_tags, offsets in zip(y_tags_strings, multiple_spaces_offsets_strings)
+        ]
 
     @staticmethod
     def _tag_segment_regexes(
-        y_tags_strings: list[list[str]], strings: list[str], segment_regexes: list[Regex]
-    ) -> list[list[str]]:
+        y_tags_strings: list[bytearray],
+        strings: list[str],
+        segment_regexes: Union[list[Regex], RegexRegistry],
+        stats: dict[str, int] | None = None,
+    ) -> list[bytearray]:
         """
         Label either the start or end indices of the matched regex patterns with 'EOS'
         @param segment_regexes: [{'regex': '<pattern>', 'at': <'end' or 'start'>}, ..]
+        @param stats: if given, its 'regex_matches' is incremented for each match
         """
+        if not isinstance(segment_regexes, RegexRegistry):
+            segment_regexes = RegexRegistry(segment_regexes)
         for string_index, string in enumerate(strings):
             assert len(string) == len(y_tags_strings[string_index])
-            for rgx in segment_regexes:
-                for matched_position in re.finditer(rgx["regex"], string):
-                    start = matched_position.start(0)
-                    end = matched_position.end(0) - 1
-                    if rgx["at"] == "start":
-                        y_tags_strings[string_index][start] = "EOS"
-                    else:
-                        y_tags_strings[string_index][end] = "EOS"
+            for rgx, matched_position in segment_regexes.finditer(string):
+                if stats is not None:
+                    stats["regex_matches"] += 1
+                start = matched_position.start(0)
+                end = matched_position.end(0) - 1
+                if rgx["at"] == "start":
+                    y_tags_strings[string_index][start] = _EOS
+                else:
+                    y_tags_strings[string_index][end] = _EOS
         return y_tags_strings
 
     @staticmethod
     def _tag_prevent_regexes(
-        y_tags_strings: list[list[str]],
+        y_tags_strings: list[bytearray],
         strings: list[str],
-        prevent_regexes: list[Regex],
+        prevent_regexes: Union[list[Regex], RegexRegistry],
         maxcut: int,
         prevent_word_split: bool,
-    ) -> list[list[str]]:
+        stats: dict[str, int] | None = None,
+    ) -> list[bytearray]:
         """
         Remove 'EOS' label for characters that are matched by prevent_regexes
         and prevent these characters from being cut due to maxcut
         @param prevent_regexes: [{'regex': '<pattern>'}, ..]
+        @param stats: if given, its 'regex_matches' is incremented for each match
         """
 
-        def _tag_prevent_word_split(y_tags: list[str], curr_string: str) -> list[str]:
+        def _tag_prevent_word_split(y_tags: bytearray, curr_string: str) -> bytearray:
             """Prevent segmentation occurring in the middle of a word"""
             assert isinstance(curr_string, str)
-            for i, tag in enumerate(y_tags[:-1]):
-                if tag != "EOS":
-                    continue
+            for i in _iter_eos(y_tags, len(y_tags) - 1):
                 char = curr_string[i]
                 if char not in _PUNCTUATIONS and not char.isspace() and not curr_string[i + 1].isspace():
-                    y_tags[i] = "O"
+                    y_tags[i] = _O
             return y_tags
 
-        def _get_last_segmented_index(labels: list[str], pivot: int) -> int:
+        def _get_last_segmented_index(labels: bytearray, pivot: int) -> int:
             """Return the closest previously cut index to pivot"""
             if pivot < 1:
                 return -1
-            for index in range(pivot - 1, -1, -1):
-                if labels[index] == "EOS":
-                    return index
-            return -1
+            return labels.rfind(_EOS, 0, pivot)
 
+        if not isinstance(prevent_regexes, RegexRegistry):
+            prevent_regexes = RegexRegistry(prevent_regexes)
         for string_index, string in enumerate(strings):
             assert len(string) == len(y_tags_strings[string_index])
             y_tags_string = y_tags_strings[string_index]
             if prevent_word_split:
                 y_tags_string = _tag_prevent_word_split(y_tags_string, string)
-            for rgx in prevent_regexes:
-                for matched_position in re.finditer(rgx["regex"], string):
-                    start = matched_position.start(0)
-                    end = matched_position.end(0) - 1
-                    # add 'O' at matched positions
-                    for pos in range(start, end + 1):
-                        y_tags_string[pos] = "O"
-
-                    # make sure this pattern is not maxcut later by segmenting before the pattern
-                    if end < maxcut:
-                        # no need to check if the pattern falls within the maxcut
-                        continue
-                    last_segmented_index = _get_last_segmented_index(y_tags_string, start)
-                    last_segmented_plus_one = last_segmented_index + 1
-                    length_to_cover = end - last_segmented_plus_one + 1  # inclusive
-                    num_cuts = math.floor(length_to_cover / maxcut)
-                    if num_cuts < 1:
-                        num_cuts = 1
-                    maxcutted_length = num_cuts * maxcut - 1
-                    next_maxcut_pos = last_segmented_plus_one + maxcutted_length
-                    # cut before the pattern if the next_maxcut_pos falls within the pattern
-                    if start <= next_maxcut_pos < end and start - 1 > 0:
-                        y_tags_string[start - 1] = "EOS"
+            for _, matched_position in prevent_regexes.finditer(string):
+                if stats is not None:
+                    stats["regex_matches"] += 1
+                start = matched_position.start(0)
+                end = matched_position.end(0) - 1
+                # add 'O' at matched positions
+                y_tags_string[start : end + 1] = bytes(end + 1 - start)
+
+                # make sure this pattern is not maxcut later by segmenting before the pattern
+                if end < maxcut:
+                    # no need to check if the pattern falls within the maxcut
+                    continue
+                last_segmented_index = _get_last_segmented_index(y_tags_string, start)
+                last_segmented_plus_one = last_segmented_index + 1
+                length_to_cover = end - last_segmented_plus_one + 1  # inclusive
+                num_cuts = math.floor(length_to_cover / maxcut)
+                if num_cuts < 1:
+                    num_cuts = 1
+                maxcutted_length = num_cuts * maxcut - 1
+                next_maxcut_pos = last_segmented_plus_one + maxcutted_length
+                # cut before the pattern if the next_maxcut_pos falls within the pattern
+                if start <= next_maxcut_pos < end and start - 1 > 0:
+                    y_tags_string[start - 1] = _EOS
 
             y_tags_strings[string_index] = y_tags_string
         return y_tags_strings
 
     @staticmethod
     def _segment_by_char_tag(
-        chars_strings: list[list[str]],
-        y_tags_strings: list[list[str]],
+        chars_strings: list[str],
+        y_tags_strings: list[bytearray],
         strip_spaces: bool,
         maxcut: int,
         mincut: int,
+        stats: dict[str, int] | None = None,
     ) -> list[str]:
         """
-        Loop through character-level tags and segment when 'EOS' and other conditions are met
-        :param chars_strings: list of lines where each line consists of characters
-        :param y_tags_strings: list of lines where each line consists of tags which are either 'O' or 'EOS'
+        Segment lines at character positions tagged 'EOS' if the other conditions are met, and at maxcut
+        :param chars_strings: list of lines
+        :param y_tags_strings: list of lines where each line consists of tags which are either `_O` or `_EOS`
+        :param stats: if given, its 'maxcut_fallbacks' is incremented for each sentence cut at maxcut
+        """
+        spans = SentSplit._spans_by_char_tag(chars_strings, y_tags_strings, strip_spaces, maxcut, mincut, stats)
+        string = "".join(chars_strings)
+        return [string[start:end] for start, end in spans]
+
+    @staticmethod
+    def _spans_by_char_tag(
+        chars_strings: list[str],
+        y_tags_strings: list[bytearray],
+        strip_spaces: bool,
+        maxcut: int,
+        mincut: int,
+        stats: dict[str, int] | None = None,
+    ) -> list[tuple[int, int]]:
+        """
+        `_segment_by_char_tag` returning the `(start, end)` offsets of the sentences into the concatenation of
+        `chars_strings` instead of the sentences themselves.
+        Only the 'EOS' positions and the points where a sentence reaches `maxcut` are visited,
+        and no sentence is sliced from the line except when it is cut at maxcut
         """
 
-        def _check_and_add_sentence(sent: str, str_len: int, cur_ind: int, is_leftover: bool = False) -> bool:
+        def _check_and_add_sentence(
+            string: str, start: int, end: int, num_remaining_chars: int, is_leftover: bool = False
+        ) -> bool:
             """
-            Check if the given `sent` can be added to `results`.
-            If so, add to `results` and return `True`; otherwise, return `False`
+            Check if the sentence `string[start:end]` can be added to `results`.
+            If so, add its offsets to `results` and return `True`; otherwise, return `False`
+            :param num_remaining_chars: number of characters after the sentence, counting its last one
             """
-            if len(sent) <= mincut:
+            sentence_length = end - start
+            if sentence_length <= mincut:
                 if not is_leftover:
                     return False
                 # if it is a leftover, but also an empty string, then don't add
-                elif len(sent) <= 0:
+                elif sentence_length <= 0:
                     return False
-            if strip_spaces:
-                sent = sent.strip()
-            if len(sent) <= 0:
-                return False
             # if the no. of remaining characters are less than mincut, don't add
-            if not is_leftover and (str_len - cur_ind) <= mincut:
+            if not is_leftover and num_remaining_chars <= mincut:
+                return False
+            if strip_spaces:
+                # same as `str.strip()`, which strips the characters for which `str.isspace()` is true
+                while start < end and string[start].isspace():
+                    start += 1
+                while end > start and string[end - 1].isspace():
+                    end -= 1
+            if end <= start:
                 return False
-            results.append(sent)
+            results.append((offset + start, offset + end))
             return True
 
-        def _segment_maxcut_string(sent: str) -> str:
+        def _segment_maxcut_string(string: str, start: int, end: int) -> int:
             """
-            Heuristically segment a maxcut string into two, add the first half to `results`, and return the remaining half.
-            A list of heuristic regexes are applied to `sent` in decreasing order of importance.
+            Heuristically segment a maxcut sentence `string[start:end]` into two, add the first half to `results`,
+            and return the start offset of the remaining half.
+            A list of heuristic regexes are applied to the sentence in decreasing order of importance.
             As soon as a matching is found, the sentence is segmented.
             """
-            rgx_punctuation_and_closing = r'(?<=[\.。︀?？!！…])[\'"’”❜❞›»❯」』)）\]］】〟]'
-            rgx_closing_and_punctuation = r'(?<=[\'"’”❜❞›»❯」』)）\]］】〟])[\.。︀?？!！…]'
-            rgx_space_and_dash = r"(?<=\s)\p{Pd}"
-            rgx_colon = r"[:﹕：;﹔；؛⁏]"
-            rgx_not_space_and_closing_and_space = r'(?<=[^\s])[\'"’”❜❞›»❯」』)）\]］】〟](?=\s)'
-            rgx_comma = r"[,，﹐]"
-            rgx_closing = r"[’”❜❞›»❯」』)）\]］】〟]"
-            rgx_whitespace = r"\s"
-            heuristics = [
-                rgx_punctuation_and_closing,
-                rgx_closing_and_punctuation,
-                rgx_space_and_dash,
-                rgx_colon,
-                rgx_not_space_and_closing_and_space,
-                rgx_comma,
-                rgx_closing,
-                rgx_whitespace,
-            ]
-            for heu in heuristics:
-                for match in re.finditer(heu, sent):
+            if stats is not None:
+                stats["maxcut_fallbacks"] += 1
+            sent = string[start:end]
+            for heu in _MAXCUT_HEURISTICS:
+                for match in heu.finditer(sent):
                     assert match.end() - match.start() == 1
-                    first_half = sent[: match.end()]
-                    if _check_and_add_sentence(first_half, len(sent), len(first_half)):
-                        return sent[match.end() :]
-            if _check_and_add_sentence(sent, string_length, current_index, is_leftover=True):
-                return ""
+                    if _check_and_add_sentence(string, start, start + match.end(), len(sent) - match.end()):
+                        return start + match.end()
+            if _check_and_add_sentence(string, start, end, 0, is_leftover=True):
+                return end
             raise RuntimeError(f"Cannot segment maxcut string: {sent}")
 
-        results = []
-        for char_string, tags in zip(chars_strings, y_tags_strings):
-            sentence = ""
-            string_length = len(char_string)
-            if string_length < 1 and len(char_string) > 0:
-                results.append(char_string)
-                continue
-            for current_index, (current_character, tag) in enumerate(zip(char_string, tags)):
-                if len(sentence) >= maxcut:
-                    sentence = _segment_maxcut_string(sentence)
-                if tag == "EOS":
-                    sentence += current_character
-                    if _check_and_add_sentence(sentence, string_length, current_index):
-                        sentence = ""
-                else:
-                    sentence += current_character
-            if _check_and_add_sentence(sentence, string_length, current_index, is_leftover=True):
-                sentence = ""
+        results: list[tuple[int, int]] = []
+        offset = 0  # offset of the current line into the concatenation of the lines
+        for string, tags in zip(chars_strings, y_tags_strings):
+            string_length = len(string)
+            eos_positions = list(_iter_eos(tags))
+            eos_positions.append(string_length)  # sentinel
+            eos_pointer = 0
+            start = 0  # start offset of the current sentence
+            index = 0  # next character to visit
+            while index < string_length:
+                eos_index = eos_positions[eos_pointer]
+                # a sentence is maxcut right before the character at which it would reach `maxcut`
+                maxcut_index = max(start + maxcut, index)
+                if maxcut_index <= eos_index and maxcut_index < string_length:
+                    start = _segment_maxcut_string(string, start, maxcut_index)
+                    index = maxcut_index
+                    if maxcut_index < eos_index:
+                        index += 1
+                        continue
+                if eos_index >= string_length:
+                    break
+                if _check_and_add_sentence(string, start, eos_index + 1, string_length - eos_index):
+                    start = eos_index + 1
+                index = eos_index + 1
+                eos_pointer += 1
+            _check_and_add_sentence(string, start, string_length, 0, is_leftover=True)
+            offset += string_length
         return results
 
     def close(self):
-        if self.tagger is not None:
-            return self.tagger.close()
+        self._emission_tagger = None
+        if self._tagger is not None:
+            tagger, self._tagger = self._tagger, None
+            self._encoder = None
+            return tagger.close()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Callable
+
+from loguru import logger
+
+from sentsplit.multi import MultiSentSplit
+
+Callback = Callable[["list[dict[str, Any]]"], None]
+
+
+class SegmentationServer:
+    """
+    Segment JSON requests with models kept loaded across requests, e.g. for `sentsplit serve`.
+
+    A request is an object `{"text": ..., "lang": ..., "id": ..., "strip_spaces": ..., "spans": ...}`, where only
+    `text` is required: `lang` defaults to `default_lang`, `id` is copied to the response, `strip_spaces` overrides
+    the config, and with `"spans": true` the response has the `(start, end)` offsets of the sentences instead of
+    the sentences. Its response is `{"id": ..., "sentences": [...]}` (or `"spans"`), or `{"id": ..., "error": ...}`.
+    The request `{"command": "stats"}` is answered with the throughput statistics of the server.
+
+    Requests submitted from any thread are segmented by one batching thread, which pools all the requests queued
+    while it was busy (up to `max_batch_size`) and segments them with one `segment_batch` call per language.
+
+    :param max_model_bytes: see `MultiSentSplit`
+    :param kwargs: configuration overrides applied to every language
+    """
+
+    def __init__(
+        self,
+        default_lang: str | None = None,
+        max_batch_size: int = 256,
+        max_model_bytes: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        assert max_batch_size > 0
+        self.default_lang = default_lang
+        self.max_batch_size = max_batch_size
+        self.multi = MultiSentSplit(max_model_bytes, **kwargs)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_time = time.monotonic()
+        self.num_requests = 0
+        self.num_errors = 0
+        self.num_batches = 0
+        self.num_chars = 0
+        self.num_sentences = 0
+        self.busy_seconds = 0.0
+
+    def __enter__(self) -> SegmentationServer:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def handle(self, requests: list[Any]) -> list[dict[str, Any]]:
+        """Segment a batch of requests, given as JSON strings or parsed objects, in the calling thread"""
+        start_time = time.perf_counter()
+        responses: list[dict[str, Any]] = [{} for _ in requests]
+        # (lang, strip_spaces, spans) -> indices of the requests
+        groups: dict[tuple[str, Any, bool], list[int]] = {}
+        texts: dict[int, str] = {}
+        for index, request in enumerate(requests):
+            try:
+                request = self._parse(request)
+            except ValueError as e:
+                responses[index] = {"error": str(e)}
+                continue
+            if "id" in request:
+                responses[index]["id"] = request["id"]
+            if request.get("command") == "stats":
+                responses[index]["stats"] = self.stats()
+                continue
+            key = (request.get("lang", self.default_lang), request.get("strip_spaces"), bool(request.get("spans")))
+            groups.setdefault(key, []).append(index)
+            texts[index] = request["text"]
+
+        for (lang, strip_spaces, spans), indices in groups.items():
+            strings = [texts[index] for index in indices]
+            try:
+                sentsplit = self.multi.get(lang)
+                if spans:
+                    results = sentsplit.segment_spans_batch(strings, strip_spaces)
+                else:
+                    results = sentsplit.segment_batch(strings, strip_spaces)
+            except Exception as e:  # e.g. a language without a model; the server keeps serving the other requests
+                for index in indices:
+                    responses[index]["error"] = f"{type(e).__name__}: {e}"
+                continue
+            for index, result in zip(indices, results):
+                responses[index]["spans" if spans else "sentences"] = result
+                self.num_sentences += len(result)
+            self.num_chars += sum(len(string) for string in strings)
+
+        self.num_requests += len(requests)
+        self.num_errors += sum(1 for response in responses if "error" in response)
+        self.num_batches += 1
+        self.busy_seconds += time.perf_counter() - start_time
+        return responses
+
+    def _parse(self, request: Any) -> dict[str, Any]:
+        if isinstance(request, (str, bytes)):
+            try:
+                request = json.loads(request)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}") from e
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a JSON object")
+        if request.get("command") == "stats":
+            return request
+        if not isinstance(request.get("text"), str):
+            raise ValueError('A request must have a "text" string')
+        if not isinstance(request.get("lang", self.default_lang), str):
+            raise ValueError('A request must have a "lang" string, as the server has no default language')
+        if request.get("strip_spaces") is not None and not isinstance(request["strip_spaces"], bool):
+            raise ValueError('"strip_spaces" must be true, false or null')
+        return request
+
+    def submit(self, requests: list[Any], callback: Callback) -> None:
+        """Queue requests for the batching thread, which calls `callback` with their responses in order"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sentsplit-server", daemon=True)
+            self._thread.start()
+        self._queue.put((requests, callback))
+
+    def segment(self, requests: list[Any]) -> list[dict[str, Any]]:
+        """Submit requests and wait for their responses"""
+        done = threading.Event()
+        results: list[list[dict[str, Any]]] = []
+
+        def callback(responses: list[dict[str, Any]]) -> None:
+            results.append(responses)
+            done.set()
+
+        self.submit(requests, callback)
+        done.wait()
+        return results[0]
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            num_requests = 0 if items[0] is None else len(items[0][0])
+            while items[-1] is not None and num_requests < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+                if item is not None:
+                    num_requests += len(item[0])
+            submitted = [item for item in items if item is not None]
+            if submitted:
+                batch = [request for requests, _ in submitted for request in requests]
+                try:
+                    responses = self.handle(batch)
+                except Exception as e:  # a bug must not stop the thread, or callers would wait forever
+                    logger.exception("Failed to answer a batch of requests")
+                    responses = [{"error": f"{type(e).__name__}: {e}"} for _ in batch]
+                offset = 0
+                for requests, callback in submitted:
+                    callback(responses[offset : offset + len(requests)])
+                    offset += len(requests)
+            if items[-1] is None:
+                return
+
+    def stats(self) -> dict[str, Any]:
+        uptime = time.monotonic() - self._start_time
+        return {
+            "uptime_seconds": uptime,
+            "requests": self.num_requests,
+            "errors": self.num_errors,
+            "batches": self.num_batches,
+            "mean_batch_size": self.num_requests / self.num_batches if self.num_batches else 0.0,
+            "chars": self.num_chars,
+            "sentences": self.num_sentences,
+            "busy_seconds": self.busy_seconds,
+            "requests_per_sec": self.num_requests / uptime if uptime else 0.0,
+            "chars_per_busy_sec": self.num_chars / self.busy_seconds if self.busy_seconds else 0.0,
+            "loaded_languages": self.multi.loaded_languages,
+        }
+
+    def close(self) -> None:
+        """Wait for the queued requests to be answered, then unload the models"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self.multi.close()
+
+
+def serve_ndjson(server: SegmentationServer, inf: IO[str], outf: IO[str]) -> None:
+    """
+    Answer newline-delimited JSON requests read from `inf` until its end, writing one response per line to `outf`
+    in request order. Lines are read while earlier ones are being segmented, so that they are batched together.
+    """
+    lock = threading.Lock()
+
+    def write_responses(responses: list[dict[str, Any]]) -> None:
+        with lock:
+            for response in responses:
+                outf.write(json.dumps(response, ensure_ascii=False) + "\n")
+            if server._queue.empty():
+                outf.flush()
+
+    for line in inf:
+        if line.strip():
+            server.submit([line], write_responses)
+    server.close()
+    outf.flush()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: _HTTPServer
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.segmentation_server.stats())
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self) -> None:
+        """Answer a request object, or an array of them, posted to /segment"""
+        if self.path.rstrip("/") != "/segment":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+        responses = self.server.segmentation_server.segment(body if isinstance(body, list) else [body])
+        self._send_json(200, responses if isinstance(body, list) else responses[0])
+
+    def _send_json(self, status: int, content: Any) -> None:
+        data = json.dumps(content, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], segmentation_server: SegmentationServer) -> None:
+        self.segmentation_server = segmentation_server
+        super().__init__(address, _RequestHandler)
+
+
+def make_http_server(server: SegmentationServer, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Return an HTTP server answering `POST /segment` with a request object (or an array of them) as the body,
+    and `GET /stats`; call its `serve_forever()` to start serving
+    """
+    return _HTTPServer((host, port), server)
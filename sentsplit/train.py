@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import random
 from collections import Counter
+from typing import Collection, Sequence, Union
 
 import pycrfsuite
 from loguru import logger
@@ -11,6 +12,8 @@ from sentsplit.utils import read_lines
 
 _PUNCTUATIONS = {".", "?", "!", '"', "'", "”", "．", "？", "！", "。", "…"}
 
+_Feature = Union[str, bytes]
+
 
 def train_crf_model(
     corpus_path: str,
@@ -121,27 +124,104 @@ def _create_features(samples: list[list[tuple[str, str]]], ngram: int) -> tuple[
     return X, y
 
 
-def _sample_to_features(sample: list[tuple[str, str]], ngram: int) -> list[list[str]]:
-    def _char_to_features(i: int) -> list[str]:
-        char = sample[i][0]
-        feats = [
-            "bias",
-            f"char={char}",
-            f"char.isdigit={char.isdigit()}",
-            f"char.isupper={char.isupper()}",
-        ]
-        for j in range(1, min(i, ngram) + 1):
-            char_j = sample[i - j][0]
-            feats.append(f"-{j}:char={char_j}")
-        for j in range(1, min(len(sample) - 1 - i, ngram) + 1):
-            char_j = sample[i + j][0]
-            feats.append(f"+{j}:char={char_j}")
-        return feats
-
-    features = []
-    for i in range(len(sample)):
-        features.append(_char_to_features(i))
-    return features
+class _CharFeatureEncoder:
+    """
+    Build character n-gram features from per-character pieces that are interned once per vocabulary item.
+    Each character maps to its own features (`bias`, `char=`, `char.isdigit=`, `char.isupper=`) and to the
+    features it contributes as the j-th left (`-j:char=`) or right (`+j:char=`) neighbour of another character,
+    so encoding a sample only gathers precomputed strings instead of formatting new ones.
+
+    For inference, `attributes` (the attribute dictionary of a loaded model) and `as_bytes` produce the input
+    straight in the form consumed by the CRFsuite binding: UTF-8 keys that need no further encoding,
+    with features unknown to the model resolved once per character rather than per occurrence.
+    Unknown own features are dropped; an unknown neighbour feature is replaced by an empty key that matches
+    no attribute, which keeps every character's contribution fixed-size and costs less than filtering every window.
+    """
+
+    def __init__(
+        self,
+        ngram: int,
+        attributes: Collection[str] | None = None,
+        as_bytes: bool = False,
+        max_vocab_size: int = 1 << 16,
+    ) -> None:
+        self.ngram = ngram
+        self.attributes = attributes
+        self.as_bytes = as_bytes
+        self.max_vocab_size = max_vocab_size
+        self._pieces: dict[str, tuple[tuple[_Feature, ...], tuple[_Feature, ...], tuple[_Feature, ...]]] = {}
+
+    def _char_pieces(self, char: str) -> tuple[tuple[_Feature, ...], tuple[_Feature, ...], tuple[_Feature, ...]]:
+        pieces = self._pieces.get(char)
+        if pieces is None:
+            if len(self._pieces) >= self.max_vocab_size:
+                self._pieces.clear()
+            own = ("bias", f"char={char}", f"char.isdigit={char.isdigit()}", f"char.isupper={char.isupper()}")
+            as_left = tuple(f"-{j}:char={char}" for j in range(1, self.ngram + 1))
+            as_right = tuple(f"+{j}:char={char}" for j in range(1, self.ngram + 1))
+            if self.attributes is not None:
+                own = tuple(feat for feat in own if feat in self.attributes)
+                as_left = tuple(feat if feat in self.attributes else "" for feat in as_left)
+                as_right = tuple(feat if feat in self.attributes else "" for feat in as_right)
+            if self.as_bytes:
+                own, as_left, as_right = (
+                    tuple(feat.encode("utf-8") for feat in part) for part in (own, as_left, as_right)
+                )
+            pieces = (own, as_left, as_right)
+            self._pieces[char] = pieces
+        return pieces
+
+    def encode(self, chars: Sequence[str]) -> list[list[_Feature]]:
+        """Return the same features as `_sample_to_features` for a sequence of single characters"""
+        ngram = self.ngram
+        char_pieces = self._char_pieces
+        pieces = [char_pieces(c) for c in chars]
+        length = len(pieces)
+        owns = [p[0] for p in pieces]
+        # lefts[j][k] is the `-{j + 1}:char=` feature contributed by the k-th character, likewise for rights
+        lefts = [[p[1][j] for p in pieces] for j in range(ngram)]
+        rights = [[p[2][j] for p in pieces] for j in range(ngram)]
+
+        def _edge_features(i: int) -> list[_Feature]:
+            return [
+                *owns[i],
+                *[lefts[j][i - j - 1] for j in range(min(i, ngram))],
+                *[rights[j][i + j + 1] for j in range(min(length - 1 - i, ngram))],
+            ]
+
+        if ngram < 1 or length <= 2 * ngram:
+            return [_edge_features(i) for i in range(length)]
+
+        # inner characters have full context on both sides, so their neighbour features are diagonals
+        # of `lefts`/`rights` that can be gathered with shifted slices
+        inner_end = length - ngram
+        inner_lefts = zip(*[lefts[j][ngram - j - 1 : inner_end - j - 1] for j in range(ngram)])
+        inner_rights = zip(*[rights[j][ngram + j + 1 : inner_end + j + 1] for j in range(ngram)])
+        features = [_edge_features(i) for i in range(ngram)]
+        features.extend(
+            [[*own, *left, *right] for own, left, right in zip(owns[ngram:inner_end], inner_lefts, inner_rights)]
+        )
+        features.extend([_edge_features(i) for i in range(inner_end, length)])
+        return features
+
+
+_encoders: dict[int, _CharFeatureEncoder] = {}
+
+
+def _get_encoder(ngram: int) -> _CharFeatureEncoder:
+    encoder = _encoders.get(ngram)
+    if encoder is None:
+        encoder = _encoders[ngram] = _CharFeatureEncoder(ngram)
+    return encoder
+
+
+def _sample_to_features(sample: Sequence[Union[str, tuple[str, str]]], ngram: int) -> list[list[str]]:
+    """
+    Convert a sample into character n-gram features
+    :param sample: either a list of (char, label) tuples or a sequence of characters (e.g. a string)
+    """
+    chars = sample if isinstance(sample, str) else [item[0] for item in sample]
+    return _get_encoder(ngram).encode(chars)
 
 
 def _sample_to_labels(sample: list[tuple[str, str]]) -> list[str]:
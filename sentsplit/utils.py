@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import mmap
+import os
+
 import regex as re
 
 
@@ -23,6 +26,12 @@ def split_keep_multiple_separators(string: str, separators: list[str]) -> list[s
     Modified from `http://programmaticallyspeaking.com/split-on-separator-but-keep-the-separator-in-python.html`
     to extend to multiple separators.
     """
+    if len(separators) == 1 and separators[0]:
+        # plain `str.split` is much cheaper than a regex split for the common single-separator case
+        separator = separators[0]
+        parts = string.split(separator)
+        return [part + separator for part in parts[:-1]] + [parts[-1]]
+
     rgx_multiple_separators = "(" + "|".join([re.escape(sep) for sep in separators]) + ")"
 
     parts = re.split(rgx_multiple_separators, string)
@@ -35,3 +44,46 @@ def split_keep_multiple_separators(string: str, separators: list[str]) -> list[s
         sentences.append(part)
 
     return sentences
+
+
+def newline_aligned_byte_ranges(file_path: str, shard_size: int) -> list[tuple[int, int]]:
+    """
+    Split a file into consecutive (start, end) byte ranges of roughly `shard_size` bytes,
+    each ending right after a line feed (or at the end of the file), so that no line spans two ranges.
+    The file is memory-mapped, so only the pages around the range boundaries are read.
+    """
+    assert shard_size > 0
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return []
+    ranges = []
+    with open(file_path, "rb") as inf, mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < file_size:
+            # extend the range up to the end of the line it cuts into
+            newline_index = mm.find(b"\n", start + shard_size - 1)
+            end = file_size if newline_index < 0 else newline_index + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def char_spans_to_byte_spans(
+    string: str, spans: list[tuple[int, int]], encoding: str = "utf-8"
+) -> list[tuple[int, int]]:
+    """
+    Convert sorted, non-overlapping `(start, end)` character offsets into `string` (e.g. from `SentSplit.segment_spans`)
+    into byte offsets into `string.encode(encoding)`, to slice the encoded text, e.g. through a `memoryview`.
+    `encoding` must not prepend a byte order mark, as UTF-16 and UTF-32 do.
+    """
+    if encoding == "utf-8" and string.isascii():
+        return list(spans)
+    byte_spans = []
+    char_offset = byte_offset = 0
+    for start, end in spans:
+        assert start >= char_offset, "spans must be sorted and must not overlap"
+        byte_start = byte_offset + len(string[char_offset:start].encode(encoding))
+        byte_end = byte_start + len(string[start:end].encode(encoding))
+        byte_spans.append((byte_start, byte_end))
+        char_offset, byte_offset = end, byte_end
+    return byte_spans
@@ -41,5 +41,6 @@ setup(
     },
     include_package_data=True,
     install_requires=requirements(),
+    extras_require={"numpy": ["numpy"]},
     python_requires=">=3.7",
 )
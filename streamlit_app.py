@@ -5,7 +5,7 @@ from typing import Iterable
 import streamlit as st
 
 import sentsplit.config
-from sentsplit.segment import SentSplit
+from sentsplit.cache import SentSplitCache
 
 supported_languages = {
     "en": {
@@ -89,7 +89,11 @@ def main():
     my_config["maxcut"] = maxcut
     my_config["strip_spaces"] = strip_spaces
     my_config["handle_multiple_spaces"] = handle_multiple_spaces
-    sent_splitter = SentSplit(language_code, **my_config)
+    # sessions run in threads of their own and a splitter is used by one thread at a time, so each session
+    # keeps its own cache, where reruns with the same language and parameters reuse the loaded splitter
+    if "sentsplit_cache" not in st.session_state:
+        st.session_state["sentsplit_cache"] = SentSplitCache(maxsize=4)
+    sent_splitter = st.session_state["sentsplit_cache"].get(language_code, **my_config)
 
     text = st.text_area(
         label="Text to split sentences",
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from sentsplit.aio import AsyncSentSplit
+from sentsplit.segment import SentSplit
+
+TEXTS = [f"Hello world number {i}. This is a test! Dr. Smith arrived at 3 p.m. on Monday." for i in range(20)]
+
+
+def test_concurrent_requests_are_batched():
+    """Concurrent requests should be coalesced into batches and get the sentences of `SentSplit.segment`."""
+    expected = [SentSplit("en").segment(text) for text in TEXTS]
+    stripped = SentSplit("en").segment(TEXTS[0], strip_spaces=True)
+
+    async def run():
+        async with AsyncSentSplit("en", max_in_flight=8) as splitter:
+            results = await asyncio.gather(*(splitter.segment(text) for text in TEXTS))
+            assert await splitter.segment(TEXTS[0], strip_spaces=True) == stripped
+            return results, splitter.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == expected
+    assert stats["requests"] == len(TEXTS) + 1
+    assert stats["batches"] < stats["requests"] and stats["mean_batch_size"] <= 8
+
+
+def test_timeout_and_cancellation():
+    """Timed out and cancelled requests should not affect the other requests."""
+
+    async def run():
+        async with AsyncSentSplit("en") as splitter:
+            with pytest.raises(asyncio.TimeoutError):
+                await splitter.segment(TEXTS[0], timeout=0)
+            cancelled = asyncio.ensure_future(splitter.segment(TEXTS[1]))
+            others = [asyncio.ensure_future(splitter.segment(text)) for text in TEXTS[2:5]]
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            results = await asyncio.gather(*others)
+            assert cancelled.cancelled()
+            assert splitter.stats()["pending"] == 0
+            return results
+
+    assert asyncio.run(run()) == [SentSplit("en").segment(text) for text in TEXTS[2:5]]
+
+
+def test_process_executor():
+    """Requests should be segmented the same by worker processes."""
+
+    async def run():
+        async with AsyncSentSplit("en", workers=2, executor="process") as splitter:
+            return await asyncio.gather(*(splitter.segment(text) for text in TEXTS[:6]))
+
+    assert asyncio.run(run()) == [SentSplit("en").segment(text) for text in TEXTS[:6]]
+    with pytest.raises(ValueError, match="executor"):
+        AsyncSentSplit("en", executor="fiber")
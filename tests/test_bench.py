@@ -0,0 +1,45 @@
+import json
+import sys
+from unittest.mock import patch
+
+from sentsplit import main
+from sentsplit.bench import SAMPLE_SENTENCES, builtin_languages, make_corpus, run_benchmark, sparse_agreement
+
+
+def test_builtin_languages_have_samples():
+    """Every built-in language should have sample sentences for its synthetic corpus."""
+    assert builtin_languages() == sorted(SAMPLE_SENTENCES)
+    assert make_corpus("en", 3, 100) == make_corpus("en", 3, 100)
+
+
+def test_bench_reports_every_stage(tmp_path, capsys):
+    """`sentsplit bench` should time every stage and report the results in JSON."""
+    result = run_benchmark("ko", num_docs=5, doc_length=200, repeat=1)
+    assert set(result["stages"]) == {
+        "split_keep_multiple_separators",
+        "substitute_multiple_spaces",
+        "features",
+        "tagger.tag",
+        "adjust_tags_for_multiple_spaces",
+        "tag_segment_regexes",
+        "tag_prevent_regexes",
+        "segment_by_char_tag",
+    }
+    assert result["num_sentences"] > 0 and result["segment"]["sentences_per_sec"] > 0
+
+    corpus_path = tmp_path / "corpus.txt"
+    corpus_path.write_text("Hello world. This is a test.\nAnother line! Done.\n")
+    with patch.object(sys, "argv", ["sentsplit", "bench", "-l", "en", "-c", str(corpus_path), "--repeat", "1"]):
+        main()
+    report = json.loads(capsys.readouterr().out)
+    assert [result["lang"] for result in report["results"]] == ["en"]
+    assert report["results"][0]["num_docs"] == 2
+
+
+def test_sparse_agreement():
+    """The sparse tagging report should compare its boundaries with full tagging and count the tagged characters."""
+    result = sparse_agreement("en", num_docs=5, doc_length=300, repeat=1)
+    assert result["sparse_context"] == 5
+    assert 0 < result["tagged_chars"] <= result["num_chars"]
+    assert result["agreeing_boundaries"] <= min(result["full_boundaries"], result["sparse_boundaries"])
+    assert 0.0 <= result["identical_docs"] <= 1.0 and result["speedup"] > 0
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+
+from sentsplit.cache import SentSplitCache, clear_cache, get_sentsplit
+from sentsplit.parallel import WindowedTagger
+from sentsplit.segment import SentSplit
+
+
+def test_cache_shares_instances_and_taggers():
+    """Equal configurations should share an instance, and configurations of one model should share a tagger."""
+    cache = SentSplitCache(maxsize=2)
+    splitter = cache.get("en")
+    assert cache.get("en") is splitter
+    assert cache.get("en", mincut=7) is splitter  # same effective config as the default
+
+    other = cache.get("en", mincut=3)
+    assert other is not splitter and other.tagger is splitter.tagger
+    assert other.segment("Hi. Hello world.") == SentSplit("en", mincut=3).segment("Hi. Hello world.")
+
+    cache.get("ko")
+    assert len(cache) == 2
+    assert cache.get("en") is not splitter  # evicted as the least recently used
+    splitter.close()  # no-op for shared instances
+    assert splitter.segment("Hello world. This is a test.") == ["Hello world.", " This is a test."]
+    cache.close()
+    assert len(cache) == 0
+
+
+def test_cache_reloads_modified_model():
+    """A model file modified on disk should be reloaded."""
+    cache = SentSplitCache()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, "custom.model")
+        shutil.copy(SentSplit("en").config["model"], model_path)
+        splitter = cache.get("xx", model=model_path).warmup()
+        assert cache.get("xx", model=model_path) is splitter
+
+        stat = os.stat(model_path)
+        os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        reloaded = cache.get("xx", model=model_path)
+        assert reloaded is not splitter and reloaded.tagger is not splitter.tagger
+    cache.close()
+
+
+def test_cache_keys_constructor_options():
+    """Constructor options that are not config keys should be part of the instance key."""
+    cache = SentSplitCache()
+    window_tagger = WindowedTagger(lambda strings: [], 5)
+    splitter = cache.get("en", window_tagger=window_tagger)
+    assert splitter.window_tagger is window_tagger and cache.get("en").window_tagger is None
+    assert cache.get("en", window_tagger=window_tagger) is splitter
+    cache.close()
+
+
+def test_instances_reopen_after_cache_close():
+    """Instances still held when the cache is closed should open their model again on next use."""
+    splitter = get_sentsplit("en")
+    tagger = splitter.warmup().tagger
+    clear_cache()
+    assert splitter.segment("Hi. There.") == SentSplit("en").segment("Hi. There.")
+    assert splitter.tagger is not tagger
+    assert get_sentsplit("en").tagger is splitter.tagger  # shared again through the cache
+    clear_cache()
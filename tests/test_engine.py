@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+from unittest.mock import patch
+
+import pycrfsuite
+import pytest
+
+from sentsplit import main
+from sentsplit.crfmodel import read_crfsuite_model
+from sentsplit.segment import _TAG_CODES, SentSplit
+
+
+def test_read_crfsuite_model():
+    """Weights read from the model file should match those reported by `Tagger.info()`, up to its rounding."""
+    model_path = SentSplit("en").config["model"]
+    model = read_crfsuite_model(model_path)
+    tagger = pycrfsuite.Tagger()
+    tagger.open(model_path)
+    info = tagger.info()
+    state_features = {
+        (model.attributes[attribute_id], model.labels[label_id]): weight
+        for attribute_id, label_id, weight in model.state_features
+    }
+    assert state_features.keys() == info.state_features.keys()
+    assert all(abs(state_features[key] - weight) < 1e-6 for key, weight in info.state_features.items())
+    for (source, destination), weight in info.transitions.items():
+        transition = model.transitions[model.labels.index(source)][model.labels.index(destination)]
+        assert abs(transition - weight) < 1e-6
+
+
+@pytest.mark.parametrize("lang", ["en", "ja", "ko"])
+def test_emission_tagger_matches_crfsuite(lang):
+    """The numpy engine should produce exactly the tags of `pycrfsuite.Tagger.tag`, alone and in batches."""
+    pytest.importorskip("numpy")
+    from sentsplit.bench import SAMPLE_SENTENCES
+    from sentsplit.engine import EmissionTagger
+
+    splitter = SentSplit(lang)
+    tagger = EmissionTagger.from_model_file(splitter.config["model"], splitter.config["ngram"])
+    rng = random.Random(0)
+    chars = "".join(SAMPLE_SENTENCES[lang]) + "AZ09 \t😀"
+    # enough strings of similar lengths to be decoded in lockstep, plus edge cases
+    strings = ["".join(rng.choice(chars) for _ in range(rng.randint(20, 40))) for _ in range(100)]
+    strings += ["", "a", " ".join(SAMPLE_SENTENCES[lang]) * 3]
+    expected = [bytearray(map(_TAG_CODES.__getitem__, splitter._tag(string))) for string in strings]
+    assert tagger.tag_batch(strings) == expected
+    assert [tagger.tag_batch([string])[0] for string in strings] == expected
+
+
+def test_numpy_engine_segments_the_same():
+    """`SentSplit(engine="numpy")` should return the same sentences as the default engine."""
+    pytest.importorskip("numpy")
+    texts = ["Hello world. This is a test.\n  Dr. Smith arrived at 3 p.m.  on Monday!\nBye.", "word " * 200, ""]
+    for config in ({}, {"strip_spaces": True, "maxcut": 60}, {"handle_multiple_spaces": False}):
+        expected = SentSplit("en", **config).segment_batch(texts)
+        with SentSplit("en", engine="numpy", **config) as splitter:
+            assert splitter.segment_batch(texts) == expected
+            assert [splitter.segment(text) for text in texts] == expected
+    with pytest.raises(ValueError, match="engine"):
+        SentSplit("en", engine="cuda")
+
+
+def test_export_model(tmp_path):
+    """`sentsplit export-model` should write a memory-mapped model that segments like the CRFsuite model."""
+    pytest.importorskip("numpy")
+    output_path = str(tmp_path / "en.emissions")
+    with patch.object(sys, "argv", ["sentsplit", "export-model", "-l", "en", "-o", output_path]):
+        main()
+    assert os.path.getsize(output_path) < os.path.getsize(SentSplit("en").config["model"])
+
+    texts = ["Hello world. This is a test.\n  Dr. Smith arrived at 3 p.m.  on Monday!\nBye.", "word " * 200]
+    with SentSplit("en", model=output_path, engine="numpy") as splitter:
+        assert splitter.segment_batch(texts) == SentSplit("en").segment_batch(texts)
+        assert not splitter._get_emission_tagger()._own.flags.writeable  # a view of the mapped file
+    with pytest.raises(ValueError, match="engine='numpy'"):
+        SentSplit("en", model=output_path)
+    with pytest.raises(ValueError, match="ngram"):
+        SentSplit("en", model=output_path, engine="numpy", ngram=3).warmup()
@@ -0,0 +1,21 @@
+import json
+import subprocess
+import sys
+
+_IMPORTED_MODULES = """
+import json, sys
+import sentsplit
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_import_is_lazy():
+    """`import sentsplit` should not load the CRF, regex, logging and multiprocessing dependencies."""
+    output = subprocess.run([sys.executable, "-c", _IMPORTED_MODULES], check=True, capture_output=True, text=True)
+    modules = json.loads(output.stdout)
+    for module in ("pycrfsuite", "regex", "loguru", "tqdm", "multiprocessing", "sentsplit.segment"):
+        assert module not in modules
+
+    import sentsplit
+
+    assert sentsplit.segment.SentSplit is not None  # submodules are still reachable as attributes
@@ -0,0 +1,56 @@
+import pytest
+
+from sentsplit.instrument import COUNTERS, STAGES, Instrumentation
+from sentsplit.segment import SentSplit
+
+
+def test_instrumentation_counts_every_stage():
+    """Instrumented segmentation should report every stage to the counters and hooks without changing results."""
+    events = []
+    instrumentation = Instrumentation(hooks=[lambda stage, counts: events.append(stage)])
+    splitter = SentSplit("en", maxcut=40, fragment_memo_chars=0, instrumentation=instrumentation)
+    text = "Visit www.example.com today.   It is fine; really.\n" + "word " * 20
+    expected = SentSplit("en", maxcut=40).segment(text)
+
+    assert splitter.segment(text) == expected
+    assert splitter.segment_batch([text]) == [expected]
+    counters = instrumentation.as_dict()
+    assert set(events) == set(STAGES)
+    for stage in STAGES:
+        assert counters[stage]["calls"] == 2
+        assert counters[stage]["chars"] == 2 * len(text)
+    assert counters["tag"]["tags"] == 2 * len(text)
+    assert counters["segment_regexes"]["regex_matches"] == 2 * 2  # after_semicolon and newline
+    assert counters["prevent_regexes"]["regex_matches"] == 2 * 3  # the URL, and its two periods before lowercase
+    assert counters["segment_by_char_tag"]["maxcut_fallbacks"] > 0
+    assert counters["segment_by_char_tag"]["sentences"] == 2 * len(expected)
+
+
+def test_instrumentation_counters_compare_across_engines():
+    """Both engines, with and without sparse tagging, should report every stage and count each character once."""
+    pytest.importorskip("numpy")
+    text = "this is a rather long sentence without any punctuation in it until the end. " * 5 + "\nShort one! Bye"
+    for sparse_context in (None, 5):
+        for engine in ("crfsuite", "numpy"):
+            instrumentation = Instrumentation()
+            splitter = SentSplit("en", engine=engine, sparse_context=sparse_context, instrumentation=instrumentation)
+            splitter.segment(text)
+            counters = instrumentation.as_dict()
+            for stage in STAGES:
+                assert counters[stage]["calls"] == 1
+                assert counters[stage]["chars"] == len(text)
+            assert counters["features"]["seconds"] > 0.0
+            assert counters["tag"]["tags"] == len(text)
+
+
+def test_instrumentation_prometheus_export():
+    """Counters should be exported in the Prometheus text format, with optional labels."""
+    instrumentation = Instrumentation()
+    SentSplit("ko", instrumentation=instrumentation).segment("안녕하세요. 반갑습니다.")
+    text = instrumentation.to_prometheus(labels={"lang": "ko"})
+    assert "# TYPE sentsplit_stage_seconds_total counter" in text
+    assert 'sentsplit_stage_calls_total{stage="tag",lang="ko"} 1' in text
+    assert len([line for line in text.splitlines() if not line.startswith("#")]) == len(COUNTERS) * len(STAGES)
+
+    instrumentation.reset()
+    assert instrumentation.as_dict()["tag"]["calls"] == 0
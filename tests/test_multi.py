@@ -0,0 +1,32 @@
+import os
+
+from sentsplit.multi import MultiSentSplit
+from sentsplit.segment import SentSplit
+
+
+def test_segment_batch_preserves_order_across_languages():
+    """Mixed-language inputs should be segmented by their language's model and returned in input order."""
+    items = [
+        ("en", "Hello world. This is a test."),
+        ("ko", "안녕하세요. 반갑습니다."),
+        ("en", "Another one! Done."),
+        ("ja", "こんにちは。元気ですか？"),
+    ]
+    with MultiSentSplit(mincut=3) as splitter:
+        expected = [SentSplit(lang, mincut=3).segment(text) for lang, text in items]
+        assert splitter.segment_batch(items) == expected
+        assert splitter.segment("en", items[0][1]) == expected[0]
+        assert splitter.loaded_languages == ["ko", "ja", "en"]
+
+
+def test_max_model_bytes_evicts_least_recently_used():
+    """Loading a language beyond `max_model_bytes` should unload the least recently used ones."""
+    en_bytes = os.path.getsize(SentSplit("en").config["model"])
+    with MultiSentSplit(max_model_bytes=en_bytes + 1) as splitter:
+        splitter.segment("en", "Hello world.")
+        en_splitter = splitter.get("en")
+        splitter.segment("ko", "안녕하세요.")
+        assert splitter.loaded_languages == ["ko"]
+        assert en_splitter._tagger is None  # closed on eviction
+        assert splitter.segment("en", "Hello world. This is a test.") == ["Hello world.", " This is a test."]
+        assert splitter.loaded_languages == ["en"]
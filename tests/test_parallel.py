@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+from sentsplit.instrument import _zero_clock
+from sentsplit.parallel import ParallelSegmenter, WindowedTagger
+from sentsplit.segment import SentSplit
+
+
+def test_parallel_segmenter_matches_segment():
+    """ParallelSegmenter should write the same sentences as segmenting each line, in input order."""
+    lines = ["Hello world. This is a test.", "", "Dr. Smith went home.\r", "Another line! With two sentences?"] * 50
+    splitter = SentSplit("en")
+    expected = [sentence for line in lines for sentence in splitter.segment(line.rstrip("\r"))]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "input.txt")
+        output_path = os.path.join(tmp_dir, "output.txt")
+        with open(input_path, "w", newline="") as outf:
+            outf.write("\n".join(lines))
+        for processes in (1, 2):
+            with ParallelSegmenter("en", processes=processes, shard_size=64, max_pending=2) as segmenter:
+                num_lines, num_sentences = segmenter.segment_file(input_path, output_path)
+                assert [s for sentences in segmenter.iter_file(input_path) for s in sentences] == expected
+            with open(output_path) as inf:
+                assert inf.read().splitlines() == expected
+            assert (num_lines, num_sentences) == (len(lines), len(expected))
+
+
+def test_windowed_tagging_matches_sequential():
+    """Long fragments tagged in overlapping windows should get the tags of tagging them at once."""
+    splitter = SentSplit("en")
+
+    def tag_strings(strings):
+        return splitter._tag_crf(strings, _zero_clock, [0.0, 0.0, 0.0])
+
+    text = " ".join(["Dr. Smith arrived at 3 p.m. on Monday!", "It was late, he said.", "word " * 30] * 40)
+    expected = tag_strings([text])[0]
+    tagger = WindowedTagger(lambda strings: [bytes(tags) for tags in tag_strings(strings)], 5, 300, 300, 32)
+    assert tagger.tag([text, "Short. Text."], tag_strings) == [expected, tag_strings(["Short. Text."])[0]]
+    assert tagger.num_windows > 10 and tagger.num_retagged_windows == 0
+
+    # windows that do not start the string disagree with their neighbours, so every cut is given up
+    def map_windows(strings):
+        return [
+            bytes(tags) if string == text[: len(string)] else b"\x01" * len(string)
+            for string, tags in zip(strings, tag_strings(strings))
+        ]
+
+    tagger = WindowedTagger(map_windows, 5, 300, 300, 32)
+    assert tagger.tag([text], tag_strings) == [expected]
+    assert tagger.num_retagged_windows > 0
+
+    # windows that do not end the string go wrong 17 characters before their cut, farther than `overlap // 2`
+    # from it, which is caught because the following window overlaps them there
+    def map_windows_wrong_before_cut(strings):
+        windows = []
+        for string, tags in zip(strings, tag_strings(strings)):
+            if not text.endswith(string):
+                tags[-32 - 17] ^= 1  # the window ends 32 characters after its cut
+            windows.append(bytes(tags))
+        return windows
+
+    tagger = WindowedTagger(map_windows_wrong_before_cut, 5, 300, 300, 32)
+    assert tagger.tag([text], tag_strings) == [expected]
+    assert tagger.num_retagged_windows > 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "input.txt")
+        with open(input_path, "w") as outf:
+            outf.write(f"Hello world. Bye.\n{text}\nLast line! Done.\n")
+        with ParallelSegmenter("en", processes=2, long_line_chars=1000, window_chars=500) as segmenter:
+            sentences = [s for sentences in segmenter.iter_file(input_path) for s in sentences]
+            assert segmenter.sentsplit.window_tagger.num_windows > 0
+    lines = ["Hello world. Bye.", text, "Last line! Done."]
+    assert sentences == [sentence for line in lines for sentence in splitter.segment(line)]
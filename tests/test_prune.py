@@ -0,0 +1,51 @@
+import json
+import sys
+from unittest.mock import patch
+
+from sentsplit import main
+from sentsplit.crfmodel import read_crfsuite_model, write_crfsuite_model
+from sentsplit.prune import prune_model
+from sentsplit.segment import SentSplit
+
+
+def test_write_crfsuite_model(tmp_path):
+    """A model read and written back should be the same file, and a pruned one should still be usable."""
+    model_path = SentSplit("en").config["model"]
+    model = read_crfsuite_model(model_path)
+    output_path = tmp_path / "en.model"
+    write_crfsuite_model(model, str(output_path))
+    with open(model_path, "rb") as inf:
+        assert output_path.read_bytes() == inf.read()
+
+    pruned = prune_model(model, top_k=500, quantize_bits=8)
+    assert len(pruned.state_features) <= 500 and len(pruned.attributes) < len(model.attributes)
+    write_crfsuite_model(pruned, str(output_path))
+    assert read_crfsuite_model(str(output_path)) == pruned
+    assert SentSplit("en", model=str(output_path)).segment("Hello world. This is a test.") == [
+        "Hello world.",
+        " This is a test.",
+    ]
+
+
+def test_prune_reports_before_and_after(tmp_path, capsys):
+    """`sentsplit prune` should write a smaller model and report both models on the held-out corpus."""
+    corpus_path = tmp_path / "heldout.txt"
+    corpus_path.write_text("Hello world.\nThis is a test.\nDr. Smith arrived at 3 p.m. on Monday!\nBye.\n" * 5)
+    output_path = tmp_path / "pruned.model"
+    argv = ["sentsplit", "prune", "-l", "en", "-c", str(corpus_path), "--threshold", "0.1", "-o", str(output_path)]
+    with patch.object(sys, "argv", argv + ["--repeat", "1", "--doc_sentences", "4"]):
+        main()
+    report = json.loads(capsys.readouterr().out)
+    assert report["num_documents"] == 5
+    assert report["after"]["model_bytes"] == output_path.stat().st_size < report["before"]["model_bytes"]
+    assert all(0.0 < report[model]["f1"] <= 1.0 for model in ("before", "after"))
+
+
+def test_pruned_model_without_transitions(tmp_path):
+    """A label whose transitions are all rounded to zero should still give a model that CRFsuite can open."""
+    model = prune_model(read_crfsuite_model(SentSplit("en").config["model"]), quantize_bits=2)
+    assert any(all(weight == 0.0 for weight in row) for row in model.transitions)
+    output_path = str(tmp_path / "en.model")
+    write_crfsuite_model(model, output_path)
+    with SentSplit("en", model=output_path, engine="crfsuite") as splitter:
+        assert "".join(splitter.segment("Hello world. This is a test.")) == "Hello world. This is a test."
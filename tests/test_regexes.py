@@ -0,0 +1,24 @@
+import regex as re
+
+from sentsplit import regexes
+from sentsplit.regexes import Regex, RegexRegistry
+
+
+def test_registry_patterns_keyed_by_name():
+    """Compiled patterns should be retrievable by regex name, or by pattern if unnamed."""
+    registry = RegexRegistry([regexes.liberal_url, Regex(regex=r"~+", at="end")])
+    assert registry.patterns["liberal_url"].pattern == regexes.liberal_url["regex"]
+    assert registry.patterns["~+"].pattern == "~+"
+
+
+def test_registry_matches_equal_raw_patterns():
+    """Registry matches, including skipped strings, should equal matching each raw pattern in order."""
+    rgxs = [regexes.liberal_url, regexes.period_followed_by_lowercase, regexes.ellipsis, regexes.after_semicolon]
+    registry = RegexRegistry(rgxs)
+    for text in [
+        "Hello world. This is a sentence.",
+        "See https://example.com/a_(b) or www.example.org, e.g. today… ok; fine",
+        "no literals at all",
+    ]:
+        expected = [(rgx["name"], m.span()) for rgx in rgxs for m in re.finditer(rgx["regex"], text)]
+        assert [(rgx["name"], m.span()) for rgx, m in registry.finditer(text)] == expected
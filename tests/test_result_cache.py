@@ -0,0 +1,43 @@
+import os
+import pickle
+import tempfile
+
+from sentsplit.result_cache import ResultCache
+from sentsplit.segment import SentSplit
+
+
+def test_result_cache_hits_and_eviction():
+    """Repeated texts should be served from the cache, keyed by text, config and `strip_spaces`."""
+    cache = ResultCache(max_entries=2)
+    splitter = SentSplit("en", result_cache=cache)
+    text = "Hello world. This is a test."
+    expected = SentSplit("en").segment(text)
+
+    assert splitter.segment(text) == expected
+    assert splitter.segment(text) == expected
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # strip_spaces and the config are part of the key
+    assert splitter.segment(text, strip_spaces=True) == ["Hello world.", "This is a test."]
+    assert SentSplit("en", mincut=20, result_cache=cache).segment(text) == [text]
+    assert len(cache) == 2
+    assert cache.stats()["misses"] == 3
+
+    assert splitter.segment_batch([text, "Bye now. See you.", text]) == [expected, ["Bye now.", " See you."], expected]
+
+
+def test_result_cache_persists_on_disk():
+    """Results stored in the database should be found by a new cache, e.g. in another process."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "results.sqlite")
+        cache = ResultCache(path=path)
+        texts = ["Hello world. This is a test.", "Bye now. See you."]
+        expected = SentSplit("en", result_cache=cache).segment_batch(texts)
+        cache.close()
+
+        restored = pickle.loads(pickle.dumps(ResultCache(path=path)))
+        assert SentSplit("en", result_cache=restored).segment_batch(texts) == expected
+        assert restored.stats()["disk_hits"] == 2 and restored.stats()["misses"] == 0
+        restored.clear()
+        assert restored.get_many([b"missing"]) == [None]
+        restored.close()
@@ -1,8 +1,10 @@
+import io
 import os
 import tempfile
 import pytest
 from unittest.mock import patch
 from sentsplit.segment import SentSplit
+from sentsplit.train import _sample_to_features
 
 
 def test_no_model_raises_value_error():
@@ -152,4 +154,134 @@ def test_segment_edge_cases():
     assert splitter.segment("This\n") == ["This\n"]
     assert splitter.segment("This is a test sentence.\n\n And here's another one.\n") == [
         "This is a test sentence.\n", "\n", " And here's another one.\n"
-    ]
\ No newline at end of file
+    ]
+
+
+def test_tag_matches_plain_features():
+    """Tagging with model-resolved UTF-8 features should equal tagging with plain string features."""
+    texts = {
+        "en": "Visit www.example.com today! It costs $3.50, i.e. cheap. Really?",
+        "zh": "这是一个测试句子。这里还有另一个！北京是中国的首都，人口约为2100万。",
+        "fr": "Bonjour.\u2028Comment allez-vous ?\rTrès bien !",
+    }
+    for lang, text in texts.items():
+        splitter = SentSplit(lang)
+        assert splitter._tag(text) == splitter.tagger.tag(_sample_to_features(text, splitter.config["ngram"]))
+
+
+def test_segment_batch():
+    """Batch segmentation should equal segmenting each string on its own, in input order."""
+    splitter = SentSplit("en", maxcut=40)
+    strings = [
+        "This is a test sentence. And here is another one.",
+        "",
+        "Footer line.\nThis is a test sentence. And here is another one.\n",
+        "Footer line.\n",
+        "A very long line without any punctuation that should be cut by maxcut somewhere",
+        "This is a test sentence. And here is another one.",
+    ]
+    expected = [splitter.segment(string) for string in strings]
+    assert splitter.segment_batch(strings) == expected
+    assert splitter.segment(strings) == expected
+    assert splitter.segment_batch(strings, strip_spaces=True) == [
+        splitter.segment(string, strip_spaces=True) for string in strings
+    ]
+
+
+def test_iter_segments():
+    """Streaming segmentation should yield the same sentences as segmenting the whole text."""
+    splitter = SentSplit("en")
+    text = "This is a test sentence. And here is another one.\n\nSecond line. Yes!\nUnfinished tail. Really"
+    expected = splitter.segment(text)
+    for chunk_size in (1, 3, 7, 1000):
+        chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+        assert list(splitter.iter_segments(chunks)) == expected
+    assert list(splitter.iter_segments(io.StringIO(text), chunk_size=5)) == expected
+    assert list(splitter.iter_segments(io.StringIO(text), strip_spaces=True)) == splitter.segment(
+        text, strip_spaces=True
+    )
+
+
+def test_iter_segments_long_line():
+    """An over-long line should be segmented early without losing any characters."""
+    splitter = SentSplit("en", maxcut=100)
+    text = "This is a test sentence. And here is another one. " * 200
+    chunks = [text[i : i + 64] for i in range(0, len(text), 64)]
+    sentences = list(splitter.iter_segments(chunks))
+    assert "".join(sentences) == text
+    assert max(len(sentence) for sentence in sentences) <= 100
+    assert sentences[:10] == splitter.segment(text)[:10]
+
+
+def test_multiple_spaces_offsets():
+    """Tags of a multiple-space-substituted string should map back onto the original string."""
+    string = "It is good.   Ha  \tHo"
+    preprocessed_string, offsets = SentSplit._substitute_multiple_spaces(string)
+    assert preprocessed_string == "It is good. Ha Ho"
+    assert [string[offsets.to_original(i)] for i in range(len(preprocessed_string))] == list("It is good. Ha Ho")
+    y_tags = bytearray(char in ".a" for char in preprocessed_string)
+    assert SentSplit._adjust_tags_for_multiple_spaces([y_tags], [offsets]) == [
+        bytearray(char in ".a" for char in string)
+    ]
+
+
+def test_tagger_is_opened_on_first_use():
+    """The model should be opened on the first segmentation or on `warmup()`, not on construction."""
+    splitter = SentSplit("en")
+    assert splitter._tagger is None
+    assert splitter.segment("Hello world. This is a test.") == ["Hello world.", " This is a test."]
+    assert splitter._tagger is not None
+
+    other = SentSplit("en")
+    assert other.warmup() is other and other._tagger is not None
+
+
+def test_fragment_memo():
+    """Repeated line fragments should be tagged once and reported in the memo stats."""
+    text = "| row | 1. value |\n| row | 1. value |\nDr. Smith arrived. He sat down.\n| row | 1. value |"
+    splitter = SentSplit("en")
+    expected = SentSplit("en", fragment_memo_chars=0).segment(text)
+    assert splitter.segment(text) == expected
+    assert splitter.segment(text) == expected
+    stats = splitter.fragment_memo_stats()
+    assert stats["entries"] == 3
+    assert stats["hits"] == 5 and stats["misses"] == 3  # the repeated row is tagged once even in the first call
+    assert SentSplit("en", fragment_memo_chars=0).fragment_memo_stats() is None
+
+    small = SentSplit("en", fragment_memo_chars=25)
+    assert small.segment(text) == expected
+    assert small.fragment_memo_stats()["chars"] <= 25
+
+
+def test_segment_spans():
+    """Spans should slice the sentences of `segment` out of the input, including after stripping and maxcut."""
+    texts = [
+        "Hello world. This is a test.\n  Dr. Smith arrived.  \n\nBye now.",
+        "   ",
+        "word " * 100,
+    ]
+    for config in ({}, {"strip_spaces": True}, {"maxcut": 40, "mincut": 3}):
+        splitter = SentSplit("en", **config)
+        for text in texts:
+            spans = splitter.segment_spans(text)
+            assert [text[start:end] for start, end in spans] == splitter.segment(text)
+        assert splitter.segment_spans_batch(texts) == [splitter.segment_spans(text) for text in texts]
+    assert SentSplit("en").segment_spans(" Hello world. Bye now. ", strip_spaces=True) == [(1, 13), (14, 22)]
+
+
+def test_sparse_tagging():
+    """Sparse tagging should only tag windows around punctuation, and agree with full tagging on plain prose."""
+    assert SentSplit._candidate_windows("a b c d e f g. h i j k l m n o p q r s t u v w x y z!", 3, 2) == [
+        (10, 17),
+        (49, 53),
+    ]
+    assert SentSplit._candidate_windows("Yes. No. Maybe", 3, 2) == [(0, 11)]
+    with pytest.raises(ValueError, match="sparse_context"):
+        SentSplit("en", sparse_context=2)
+
+    sentence = "this is a rather long sentence without any punctuation in it until the end."
+    text = " ".join([sentence] * 5) + "\nShort one! Bye"
+    expected = SentSplit("en").segment(text)
+    splitter = SentSplit("en", sparse_context=5)
+    assert splitter.segment(text) == expected
+    assert splitter.segment_batch([text, "no punctuation at all"]) == [expected, ["no punctuation at all"]]
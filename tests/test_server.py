@@ -0,0 +1,65 @@
+import io
+import json
+import threading
+import urllib.request
+from unittest.mock import patch
+
+from sentsplit.segment import SentSplit
+from sentsplit.server import SegmentationServer, make_http_server, serve_ndjson
+
+
+def test_serve_ndjson():
+    """Each request line should be answered in order, including invalid requests and the stats command."""
+    text = "Hello world. This is a test."
+    lines = [
+        json.dumps({"id": 1, "text": text}),
+        json.dumps({"id": 2, "text": "안녕하세요. 반갑습니다.", "lang": "ko"}),
+        json.dumps({"id": 3, "text": text, "spans": True, "strip_spaces": True}),
+        "not json",
+        json.dumps({"id": 4, "text": text, "lang": "xx"}),
+        json.dumps({"id": 5, "command": "stats"}),
+        json.dumps({"id": 6, "text": text, "strip_spaces": [1]}),
+    ]
+    outf = io.StringIO()
+    server = SegmentationServer("en")
+    serve_ndjson(server, io.StringIO("\n".join(lines) + "\n"), outf)
+    responses = [json.loads(line) for line in outf.getvalue().splitlines()]
+
+    assert [response.get("id") for response in responses] == [1, 2, 3, None, 4, 5, None]
+    assert responses[0]["sentences"] == SentSplit("en").segment(text)
+    assert responses[1]["sentences"] == SentSplit("ko").segment("안녕하세요. 반갑습니다.")
+    assert responses[2]["spans"] == [list(span) for span in SentSplit("en").segment_spans(text, strip_spaces=True)]
+    assert "Invalid JSON" in responses[3]["error"] and "error" in responses[4]
+    assert set(responses[5]["stats"]) >= {"requests", "batches", "chars_per_busy_sec"}
+    assert "strip_spaces" in responses[6]["error"]
+    assert server.num_requests == len(lines) and server.num_errors == 3
+
+
+def test_batching_thread_survives_errors():
+    """An unexpected error while answering a batch should become error responses, not stop the server."""
+    with SegmentationServer("en") as server:
+        with patch.object(server, "handle", side_effect=RuntimeError("boom")):
+            assert server.segment([{"text": "Hello."}, {"text": "Bye."}]) == [{"error": "RuntimeError: boom"}] * 2
+        assert server.segment([{"text": "Hello. Bye."}])[0]["sentences"] == SentSplit("en").segment("Hello. Bye.")
+
+
+def test_http_server():
+    """The HTTP server should answer request objects and arrays, and report its stats."""
+    with SegmentationServer("en") as server:
+        http_server = make_http_server(server, port=0)
+        thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{http_server.server_port}"
+        try:
+            for body, expected in [
+                ({"text": "Hello world. This is a test."}, {"sentences": ["Hello world.", " This is a test."]}),
+                ([{"id": "a", "text": "Hi there."}], [{"id": "a", "sentences": ["Hi there."]}]),
+            ]:
+                request = urllib.request.Request(url + "/segment", data=json.dumps(body).encode("utf-8"))
+                with urllib.request.urlopen(request) as response:
+                    assert json.loads(response.read()) == expected
+            with urllib.request.urlopen(url + "/stats") as response:
+                assert json.loads(response.read())["requests"] == 2
+        finally:
+            http_server.shutdown()
+            http_server.server_close()
@@ -0,0 +1,34 @@
+from sentsplit.train import _sample_to_features
+
+
+def test_sample_to_features():
+    """Test character n-gram features of a short sample."""
+    assert _sample_to_features([("A", "O"), ("1", "O"), (".", "EOS")], 1) == [
+        ["bias", "char=A", "char.isdigit=False", "char.isupper=True", "+1:char=1"],
+        ["bias", "char=1", "char.isdigit=True", "char.isupper=False", "-1:char=A", "+1:char=."],
+        ["bias", "char=.", "char.isdigit=False", "char.isupper=False", "-1:char=1"],
+    ]
+
+
+def test_sample_to_features_string_input():
+    """Test that a plain string is featurized like a list of (char, label) tuples."""
+    text = "Hello world. This is a sentence."
+    for ngram in range(0, 7):
+        assert _sample_to_features(text, ngram) == _sample_to_features([(c, "O") for c in text], ngram)
+    features = _sample_to_features(text, 5)
+    assert features[10] == [
+        "bias",
+        "char=d",
+        "char.isdigit=False",
+        "char.isupper=False",
+        "-1:char=l",
+        "-2:char=r",
+        "-3:char=o",
+        "-4:char=w",
+        "-5:char= ",
+        "+1:char=.",
+        "+2:char= ",
+        "+3:char=T",
+        "+4:char=h",
+        "+5:char=i",
+    ]
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+from sentsplit.utils import char_spans_to_byte_spans, newline_aligned_byte_ranges
+
+
+def test_newline_aligned_byte_ranges():
+    """Byte ranges should cover the file contiguously and end right after a line feed or at the end of the file."""
+    contents = ["", "a\n", "a\nb", "short\n" + "x" * 100 + "\nend", "line\n" * 40]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "input.txt")
+        for content in contents:
+            data = content.encode("utf-8")
+            with open(path, "wb") as outf:
+                outf.write(data)
+            for shard_size in (1, 7, 64, 1 << 20):
+                ranges = newline_aligned_byte_ranges(path, shard_size)
+                assert b"".join(data[start:end] for start, end in ranges) == data
+                assert all(data[end - 1 : end] == b"\n" for _, end in ranges[:-1])
+                assert all(end - start >= shard_size for start, end in ranges[:-1])
+
+
+def test_char_spans_to_byte_spans():
+    """Byte spans should slice the same text out of the encoded string as the character spans."""
+    for string in ("plain ascii text", "“Quoted.” 한국어 문장입니다. Done."):
+        spans = [(0, 3), (3, 9), (10, len(string))]
+        data = memoryview(string.encode("utf-8"))
+        byte_spans = char_spans_to_byte_spans(string, spans)
+        assert [bytes(data[start:end]).decode("utf-8") for start, end in byte_spans] == [
+            string[start:end] for start, end in spans
+        ]